@@ -1,6 +1,10 @@
 import uvicorn
 import logging
+import multiprocessing
+import os
 from pathlib import Path
+
+from app import config
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -20,16 +24,31 @@ if __name__ == "__main__":
     logger.info("  - Host: 0.0.0.0")
     logger.info("  - Port: 8000")
     logger.info("  - Reload: Enabled")
+    logger.info(f"  - Workers: {config.WEB_WORKERS}")
     logger.info("  - API Docs: http://localhost:8000/docs")
     logger.info("  - Health Check: http://localhost:8000/health")
     logger.info("=" * 80)
 
+    # With several API workers one separate process owns the Binance connection
+    # and publishes market data to shared memory that every worker reads
+    ingest_process = None
+    if config.WEB_WORKERS > 1:
+        from app import ingest
+
+        os.environ["MARKET_DATA_MODE"] = "shared"
+        ingest_process = multiprocessing.get_context("spawn").Process(
+            target=ingest.main, name="market-data-ingest"
+        )
+        ingest_process.start()
+        logger.info(f"  - Market data ingest: pid {ingest_process.pid}")
+
     try:
         uvicorn.run(
             "app.main:app",
             host="0.0.0.0",
             port=8000,
             reload=False,  # Disabled to prevent constant reloading
+            workers=config.WEB_WORKERS,
             log_level="info",
             access_log=True
         )
@@ -38,3 +57,7 @@ if __name__ == "__main__":
     except Exception as e:
         logger.error(f"Failed to start server: {e}")
         raise
+    finally:
+        if ingest_process is not None:
+            ingest_process.terminate()
+            ingest_process.join(timeout=10)
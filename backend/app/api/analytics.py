@@ -1,11 +1,17 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import Optional, List
+from collections import defaultdict
+import asyncio
 import io
 import csv
 import logging
 import math
+import numpy as np
+
+from app.api import http_cache
+from app.services import workers
+from app.services.analytics_service import johansen_summary, optional_float, sanitize_array
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +29,8 @@ class ComputeAnalyticsRequest(BaseModel):
     symbolB: str
     timeframe: str = "1m"
     regressionType: str = "ols"
+    window: int = 20
+    halflife: Optional[float] = None
 
 
 class ADFTestRequest(BaseModel):
@@ -30,14 +38,72 @@ class ADFTestRequest(BaseModel):
     symbolB: str
 
 
-@router.post("/compute")
-async def compute_analytics(request: ComputeAnalyticsRequest):
+class BatchJob(BaseModel):
+    symbolA: str
+    symbolB: str
+    regressionType: str = "ols"
+    window: int = 20
+    halflife: Optional[float] = None
+
+
+class BatchAnalyticsRequest(BaseModel):
+    jobs: List[BatchJob]
+    includeSeries: bool = True
+    includeDiagnostics: bool = True
+
+
+class RollingCointegrationRequest(BaseModel):
+    symbolA: str
+    symbolB: str
+    regressionType: str = "ols"
+    window: int = 50
+    stride: int = 1
+    lags: Optional[int] = None
+
+
+class JohansenRequest(BaseModel):
+    symbols: List[str]
+    detOrder: int = 0
+    kArDiff: int = 1
+
+
+MAX_BATCH_JOBS = 500
+
+# Johansen critical values are tabulated for up to 12 series
+MAX_JOHANSEN_LEGS = 12
+
+# Hedge ratio methods without a closed form; these fan out to the worker pool
+POOLED_METHODS = {"kalman", "huber", "theilsen"}
+
+
+def zscore_params_error(window: int, halflife: Optional[float]) -> Optional[str]:
+    if window < 2:
+        return "window must be at least 2"
+    if halflife is not None and halflife <= 0:
+        return "halflife must be positive"
+    return None
+
+
+def _compute_analytics(http_request: Request, request: ComputeAnalyticsRequest):
+    # Shared by POST and GET /compute; both use the same ETag, so a GET can
+    # revalidate a body first produced for a POST
     try:
         from app.main import binance_client, analytics_service
 
         if not binance_client or not analytics_service:
             raise HTTPException(status_code=503, detail="Services not initialized")
 
+        params_error = zscore_params_error(request.window, request.halflife)
+        if params_error:
+            raise HTTPException(status_code=400, detail=params_error)
+
+        etag = http_cache.make_etag(
+            "compute", binance_client, [request.symbolA, request.symbolB], request.model_dump()
+        )
+        cached = http_cache.cached_response(http_request, etag, "compute")
+        if cached is not None:
+            return cached
+
         ohlc_a = binance_client.get_ohlc(request.symbolA, count=100)
         ohlc_b = binance_client.get_ohlc(request.symbolB, count=100)
 
@@ -60,10 +126,12 @@ async def compute_analytics(request: ComputeAnalyticsRequest):
             prices_a,
             prices_b,
             timestamps,
-            request.regressionType
+            request.regressionType,
+            request.window,
+            request.halflife
         )
 
-        return analytics
+        return http_cache.json_response(etag, analytics)
 
     except HTTPException:
         raise
@@ -72,6 +140,32 @@ async def compute_analytics(request: ComputeAnalyticsRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/compute")
+async def compute_analytics(request: ComputeAnalyticsRequest, http_request: Request):
+    return _compute_analytics(http_request, request)
+
+
+@router.get("/compute")
+async def compute_analytics_get(
+    http_request: Request,
+    symbolA: str,
+    symbolB: str,
+    timeframe: str = "1m",
+    regressionType: str = "ols",
+    window: int = 20,
+    halflife: Optional[float] = None
+):
+    request = ComputeAnalyticsRequest(
+        symbolA=symbolA,
+        symbolB=symbolB,
+        timeframe=timeframe,
+        regressionType=regressionType,
+        window=window,
+        halflife=halflife
+    )
+    return _compute_analytics(http_request, request)
+
+
 @router.post("/adf-test")
 async def run_adf_test(request: ADFTestRequest):
     try:
@@ -118,9 +212,12 @@ async def run_adf_test(request: ADFTestRequest):
 
 @router.get("/export")
 async def export_csv(
+    http_request: Request,
     symbolA: str,
     symbolB: str,
-    format: str = "csv"
+    format: str = "csv",
+    window: int = 20,
+    halflife: Optional[float] = None
 ):
     try:
         from app.main import binance_client, analytics_service
@@ -128,6 +225,18 @@ async def export_csv(
         if not binance_client or not analytics_service:
             raise HTTPException(status_code=503, detail="Services not initialized")
 
+        params_error = zscore_params_error(window, halflife)
+        if params_error:
+            raise HTTPException(status_code=400, detail=params_error)
+
+        etag = http_cache.make_etag(
+            "export", binance_client, [symbolA, symbolB],
+            {"symbolA": symbolA, "symbolB": symbolB, "format": format, "window": window, "halflife": halflife}
+        )
+        cached = http_cache.cached_response(http_request, etag, "export")
+        if cached is not None:
+            return cached
+
         ohlc_a = binance_client.get_ohlc(symbolA, count=100)
         ohlc_b = binance_client.get_ohlc(symbolB, count=100)
 
@@ -145,7 +254,7 @@ async def export_csv(
 
         beta = analytics_service.compute_hedge_ratio(prices_a, prices_b)
         spread = analytics_service.compute_spread(prices_a, prices_b, beta)
-        zscore = analytics_service.compute_zscore(spread)
+        zscore = analytics_service.compute_zscore(spread, window, halflife)
 
         output = io.StringIO()
         writer = csv.writer(output)
@@ -160,10 +269,10 @@ async def export_csv(
                 zscore[i]
             ])
 
-        output.seek(0)
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
+        return http_cache.bytes_response(
+            etag,
+            output.getvalue().encode(),
+            "text/csv",
             headers={
                 "Content-Disposition": f"attachment; filename=analytics_{symbolA}_{symbolB}.csv"
             }
@@ -177,7 +286,7 @@ async def export_csv(
 
 
 @router.get("/correlation-matrix")
-async def get_correlation_matrix():
+async def get_correlation_matrix(http_request: Request):
     try:
         from app.main import binance_client, analytics_service
 
@@ -185,6 +294,12 @@ async def get_correlation_matrix():
             raise HTTPException(status_code=503, detail="Services not initialized")
 
         symbols = ["btcusdt", "ethusdt", "bnbusdt", "solusdt"]
+
+        etag = http_cache.make_etag("correlation-matrix", binance_client, symbols, {})
+        cached = http_cache.cached_response(http_request, etag, "correlation-matrix")
+        if cached is not None:
+            return cached
+
         price_data = {}
 
         for symbol in symbols:
@@ -197,13 +312,255 @@ async def get_correlation_matrix():
 
         corr_matrix = analytics_service.compute_correlation_matrix(price_data)
 
-        return {
+        return http_cache.json_response(etag, {
             'symbols': list(price_data.keys()),
             'correlation_matrix': corr_matrix
-        }
+        })
 
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Correlation matrix error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/rolling-cointegration")
+async def rolling_cointegration(request: RollingCointegrationRequest):
+    try:
+        from app.main import binance_client, analytics_service
+
+        if not binance_client or not analytics_service:
+            raise HTTPException(status_code=503, detail="Services not initialized")
+
+        ohlc_a = binance_client.get_ohlc(request.symbolA, count=200)
+        ohlc_b = binance_client.get_ohlc(request.symbolB, count=200)
+        min_len = min(len(ohlc_a), len(ohlc_b))
+
+        if request.window < 20:
+            raise HTTPException(status_code=400, detail="window must be at least 20")
+        if request.window > min_len:
+            raise HTTPException(status_code=404, detail=f"Insufficient data for window {request.window} ({min_len} candles)")
+        if request.stride < 1:
+            raise HTTPException(status_code=400, detail="stride must be at least 1")
+        if request.lags is not None and not 0 <= request.lags <= (request.window - 4) // 2:
+            raise HTTPException(status_code=400, detail=f"lags must be between 0 and {(request.window - 4) // 2}")
+
+        prices_a = [c['close'] for c in ohlc_a[:min_len]]
+        prices_b = [c['close'] for c in ohlc_b[:min_len]]
+        timestamps = [c['timestamp'] for c in ohlc_a[:min_len]]
+
+        result = await workers.run_in_worker(
+            analytics_service.compute_rolling_cointegration,
+            prices_a,
+            prices_b,
+            request.regressionType,
+            request.window,
+            request.stride,
+            request.lags
+        )
+        if result is None:
+            raise HTTPException(status_code=422, detail="Rolling cointegration is undefined for these series")
+
+        pvalues = result['adf_pvalue']
+        return {
+            'symbolA': request.symbolA,
+            'symbolB': request.symbolB,
+            'regression_type': request.regressionType,
+            'hedge_ratio': sanitize_float(float(result['hedge_ratio'])),
+            'window': request.window,
+            'stride': request.stride,
+            'lags': result['lags'],
+            'timestamps': [timestamps[i] for i in result['window_end']],
+            'adf': {
+                'statistic': [optional_float(v) for v in result['adf_statistic']],
+                'pvalue': [optional_float(v) for v in pvalues],
+                'critical_values': {k: sanitize_float(v) for k, v in result['critical_values'].items()},
+                'stationary_fraction': sanitize_float(float(np.mean(pvalues < 0.05))) if len(pvalues) else 0.0
+            },
+            'rolling_hedge_ratio': [optional_float(v) for v in result['rolling_hedge_ratio']],
+            'residual_variance': [optional_float(v) for v in result['residual_variance']]
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Rolling cointegration error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/johansen")
+async def johansen_test(request: JohansenRequest):
+    try:
+        from app.main import binance_client, analytics_service
+
+        if not binance_client or not analytics_service:
+            raise HTTPException(status_code=503, detail="Services not initialized")
+
+        symbols = [symbol.lower() for symbol in request.symbols]
+        if len(set(symbols)) != len(symbols):
+            raise HTTPException(status_code=400, detail="Symbols must be distinct")
+        if not 2 <= len(symbols) <= MAX_JOHANSEN_LEGS:
+            raise HTTPException(status_code=400, detail=f"Between 2 and {MAX_JOHANSEN_LEGS} symbols are required")
+        if request.detOrder not in (-1, 0, 1):
+            raise HTTPException(status_code=400, detail="detOrder must be -1, 0 or 1")
+        if not 0 <= request.kArDiff <= 10:
+            raise HTTPException(status_code=400, detail="kArDiff must be between 0 and 10")
+
+        closes = [[c['close'] for c in binance_client.get_ohlc(symbol, count=100)] for symbol in symbols]
+        min_len = min(len(series) for series in closes)
+        if min_len < 20:
+            raise HTTPException(status_code=404, detail="Insufficient data")
+
+        series = np.array([values[:min_len] for values in closes])
+        result = analytics_service.compute_johansen_test(series, request.detOrder, request.kArDiff)
+        summary = johansen_summary(result) if result is not None else None
+        if summary is None:
+            raise HTTPException(status_code=422, detail="Johansen test is undefined for these series")
+
+        return {
+            'symbols': request.symbols,
+            'det_order': request.detOrder,
+            'k_ar_diff': request.kArDiff,
+            'observations': min_len,
+            **summary,
+            'max_eigen_statistic': sanitize_array(result['max_eigen_statistic']),
+            'weights': dict(zip(request.symbols, summary['weights']))
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Johansen test error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch")
+async def compute_batch_analytics(request: BatchAnalyticsRequest):
+    try:
+        from app.main import binance_client, analytics_service
+
+        if not binance_client or not analytics_service:
+            raise HTTPException(status_code=503, detail="Services not initialized")
+
+        jobs = request.jobs
+        if not jobs:
+            raise HTTPException(status_code=400, detail="At least one job is required")
+        if len(jobs) > MAX_BATCH_JOBS:
+            raise HTTPException(status_code=400, detail=f"Too many jobs (maximum {MAX_BATCH_JOBS})")
+
+        # Each symbol's series is extracted once, however many jobs reference it
+        closes = {}
+        timestamps = {}
+        for symbol in {s.lower() for job in jobs for s in (job.symbolA, job.symbolB)}:
+            ohlc = binance_client.get_ohlc(symbol, count=100)
+            closes[symbol] = np.array([candle['close'] for candle in ohlc], dtype=float)
+            timestamps[symbol] = [candle['timestamp'] for candle in ohlc]
+
+        results: List[Optional[dict]] = [None] * len(jobs)
+        lengths = {}
+        for i, job in enumerate(jobs):
+            a, b = job.symbolA.lower(), job.symbolB.lower()
+            min_len = min(len(closes[a]), len(closes[b]))
+            if min_len < 20:
+                results[i] = {'error': 'Not enough data points (minimum 20)'}
+            elif zscore_params_error(job.window, job.halflife):
+                results[i] = {'error': zscore_params_error(job.window, job.halflife)}
+            else:
+                lengths[i] = min_len
+
+        pooled = [i for i in lengths if jobs[i].regressionType in POOLED_METHODS]
+        pooled_tasks = [
+            asyncio.ensure_future(workers.run_in_worker(
+                analytics_service.compute_hedge_ratio,
+                closes[jobs[i].symbolA.lower()][:lengths[i]],
+                closes[jobs[i].symbolB.lower()][:lengths[i]],
+                jobs[i].regressionType
+            ))
+            for i in pooled
+        ]
+
+        # Jobs sharing a series length are stacked into (jobs x time) matrices
+        groups = defaultdict(list)
+        for i, n in lengths.items():
+            groups[n].append(i)
+
+        stacked = {}
+        betas = np.ones(len(jobs))
+        correlations = np.zeros(len(jobs))
+        for n, indices in groups.items():
+            prices_a = np.vstack([closes[jobs[i].symbolA.lower()][:n] for i in indices])
+            prices_b = np.vstack([closes[jobs[i].symbolB.lower()][:n] for i in indices])
+            stacked[n] = (prices_a, prices_b)
+
+            ols_rows = [row for row, i in enumerate(indices) if jobs[i].regressionType not in POOLED_METHODS]
+            if ols_rows:
+                beta, _ = analytics_service.compute_ols_regression_batch(prices_a[ols_rows], prices_b[ols_rows])
+                betas[[indices[row] for row in ols_rows]] = beta
+
+            correlations[indices] = analytics_service.compute_correlation_batch(prices_a, prices_b)
+
+        for i, beta in zip(pooled, await asyncio.gather(*pooled_tasks)):
+            betas[i] = beta
+
+        for n, indices in groups.items():
+            prices_a, prices_b = stacked[n]
+            spreads = prices_a - betas[indices][:, None] * prices_b
+
+            if request.includeDiagnostics:
+                half_lives = analytics_service.compute_half_life(spreads)
+                hursts = analytics_service.compute_hurst_exponent(spreads)
+                johansen = analytics_service.compute_johansen_test(np.stack([prices_a, prices_b], axis=1))
+
+            by_params = defaultdict(list)
+            for row, i in enumerate(indices):
+                by_params[(jobs[i].window, jobs[i].halflife)].append(row)
+
+            for (window, halflife), rows in by_params.items():
+                zscores = analytics_service.compute_zscore(spreads[rows], window, halflife)
+
+                for row, zscore in zip(rows, zscores):
+                    i = indices[row]
+                    job = jobs[i]
+                    spread = spreads[row]
+                    result = {
+                        'symbolA': job.symbolA,
+                        'symbolB': job.symbolB,
+                        'regression_type': job.regressionType,
+                        'window': window,
+                        'halflife': halflife,
+                        'hedge_ratio': sanitize_float(float(betas[i])),
+                        'correlation': sanitize_float(float(correlations[i])),
+                        'spread': {
+                            'mean': sanitize_float(float(spread.mean())),
+                            'std': sanitize_float(float(spread.std()))
+                        },
+                        'zscore': {
+                            'current': sanitize_float(float(zscore[-1]))
+                        }
+                    }
+                    if request.includeDiagnostics:
+                        result['half_life'] = optional_float(half_lives[row])
+                        result['hurst_exponent'] = optional_float(hursts[row])
+                        result['johansen'] = johansen_summary(johansen, row) if johansen else None
+                    if request.includeSeries:
+                        result['spread']['values'] = sanitize_array(spread)
+                        result['spread']['timestamps'] = timestamps[job.symbolA.lower()][:n]
+                        result['zscore']['values'] = sanitize_array(zscore)
+                    results[i] = result
+
+        for i, job in enumerate(jobs):
+            if 'error' in results[i]:
+                results[i].update({'symbolA': job.symbolA, 'symbolB': job.symbolB,
+                                   'regression_type': job.regressionType, 'window': job.window,
+                                   'halflife': job.halflife})
+
+        return {
+            'count': len(results),
+            'results': results
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch analytics error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
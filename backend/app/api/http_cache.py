@@ -0,0 +1,89 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+import hashlib
+import json
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app import config
+from app.services import metrics
+
+# Snapshot endpoints return the same body until one of their symbols closes a
+# candle. Their ETag is derived from the symbols' candle versions plus the
+# request parameters, so it is known before any analytics work is done.
+
+
+class ResponseCache:
+    # Serialized bodies by ETag; the least recently used entry is evicted first
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Tuple[bytes, str, Dict[str, str]]]" = OrderedDict()
+
+    def get(self, etag: str) -> Optional[Tuple[bytes, str, Dict[str, str]]]:
+        entry = self.entries.get(etag)
+        if entry is not None:
+            self.entries.move_to_end(etag)
+        return entry
+
+    def put(self, etag: str, body: bytes, media_type: str, headers: Dict[str, str]):
+        if self.max_entries <= 0:
+            return
+        self.entries[etag] = (body, media_type, headers)
+        self.entries.move_to_end(etag)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+response_cache = ResponseCache(config.HTTP_CACHE_ENTRIES)
+
+
+def make_etag(endpoint: str, market_client, symbols: Iterable[str], params: dict) -> str:
+    versions = [market_client.get_candle_version(symbol) for symbol in symbols]
+    key = json.dumps([endpoint, versions, params], sort_keys=True, default=str)
+    return f'"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}"'
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={config.HTTP_CACHE_MAX_AGE}, must-revalidate"
+    }
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def cached_response(request: Request, etag: str, endpoint: str) -> Optional[Response]:
+    # A 304 for a matching conditional GET, the stored bytes for a repeat
+    # request, or None when the body has to be computed
+    if request.method == "GET" and _etag_matches(request.headers.get("if-none-match"), etag):
+        metrics.HTTP_CACHE_RESULTS.inc(endpoint=endpoint, result="not_modified")
+        return Response(status_code=304, headers=cache_headers(etag))
+
+    entry = response_cache.get(etag)
+    if entry is not None:
+        body, media_type, headers = entry
+        metrics.HTTP_CACHE_RESULTS.inc(endpoint=endpoint, result="hit")
+        return Response(content=body, media_type=media_type, headers={**headers, **cache_headers(etag)})
+
+    metrics.HTTP_CACHE_RESULTS.inc(endpoint=endpoint, result="miss")
+    return None
+
+
+def json_response(etag: str, content) -> Response:
+    response = JSONResponse(jsonable_encoder(content), headers=cache_headers(etag))
+    response_cache.put(etag, response.body, response.media_type, {})
+    return response
+
+
+def bytes_response(etag: str, body: bytes, media_type: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    headers = headers or {}
+    response_cache.put(etag, body, media_type, headers)
+    return Response(content=body, media_type=media_type, headers={**headers, **cache_headers(etag)})
@@ -0,0 +1,111 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from datetime import datetime
+from pathlib import Path
+import logging
+import re
+import time
+
+from app import config
+from app.services import metrics, runtime
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+BINANCE_CONNECTED = metrics.registry.gauge(
+    "binance_connected", "1 when the market data client is running")
+BINANCE_BUFFER_CANDLES = metrics.registry.gauge(
+    "binance_buffer_candles", "Closed candles held in memory per symbol")
+PROCESS_RESIDENT_MEMORY = metrics.registry.gauge(
+    "process_resident_memory_bytes", "Resident memory size of this worker process")
+PROCESS_AGE = metrics.registry.gauge(
+    "process_uptime_seconds", "Seconds since this worker process started")
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+
+class MetricsMiddleware:
+    # Plain ASGI middleware: times every HTTP request by route template and, when
+    # PROFILE_SLOW_REQUESTS_MS is set and pyinstrument is installed, keeps a
+    # sampling profile of any request slower than the threshold.
+    def __init__(self, app):
+        self.app = app
+        self.profile_threshold = config.PROFILE_SLOW_REQUESTS_MS / 1000
+        self.profile_dir = Path(config.PROFILE_DIR)
+
+        if self.profile_threshold > 0 and Profiler is None:
+            logger.warning("PROFILE_SLOW_REQUESTS_MS is set but pyinstrument is not installed; profiling disabled")
+            self.profile_threshold = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        profiler = None
+        if self.profile_threshold > 0:
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            metrics.HTTP_REQUEST_SECONDS.observe(elapsed, path=path, method=scope["method"])
+            metrics.HTTP_REQUESTS.inc(path=path, method=scope["method"], status=status["code"])
+
+            if profiler is not None:
+                profiler.stop()
+                if elapsed >= self.profile_threshold:
+                    self._save_profile(profiler, scope["path"], elapsed)
+
+    def _save_profile(self, profiler, path: str, elapsed: float):
+        try:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+            filename = self.profile_dir / f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{slug}.txt"
+            filename.write_text(profiler.output_text(unicode=True))
+            logger.warning(f"Slow request {path} took {elapsed * 1000:.1f}ms, profile saved to {filename}")
+        except Exception as e:
+            logger.error(f"Failed to save request profile: {e}")
+
+
+def render_metrics(market_client) -> str:
+    # Shared by the API's /metrics and the ingest process's metrics server
+    BINANCE_CONNECTED.set(1 if market_client and market_client.is_running else 0)
+    if market_client:
+        for symbol, count in market_client.get_data_counts().items():
+            BINANCE_BUFFER_CANDLES.set(count, symbol=symbol)
+
+    rss = runtime.resident_memory_bytes()
+    if rss:
+        PROCESS_RESIDENT_MEMORY.set(rss)
+    PROCESS_AGE.set(runtime.process_age())
+
+    return metrics.registry.render()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    from app.main import binance_client
+
+    return PlainTextResponse(
+        render_metrics(binance_client),
+        media_type=CONTENT_TYPE
+    )
@@ -0,0 +1,101 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import Optional
+import logging
+
+from app import config
+from app.api.analytics import zscore_params_error
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+REGRESSION_TYPES = {"ols", "kalman", "huber", "theilsen"}
+
+
+class SignalRuleRequest(BaseModel):
+    symbolA: str
+    symbolB: str
+    metric: str
+    condition: str
+    threshold: float
+    regressionType: str = "ols"
+    window: int = 20
+    halflife: Optional[float] = None
+    name: Optional[str] = None
+
+
+def _get_engine():
+    from app.main import binance_client, signal_engine
+
+    if not binance_client or not signal_engine:
+        raise HTTPException(status_code=503, detail="Services not initialized")
+    return binance_client, signal_engine
+
+
+@router.post("/rules")
+async def create_rule(request: SignalRuleRequest):
+    binance_client, signal_engine = _get_engine()
+
+    # Each API worker holds its own rules in memory, so with several workers a
+    # rule would only be visible to (and fire from) the one that registered it
+    if config.MARKET_DATA_MODE == "shared":
+        raise HTTPException(
+            status_code=409,
+            detail="Signal rules are not supported with multiple API workers (MARKET_DATA_MODE=shared); "
+                   "run a single worker (WEB_WORKERS=1) to use them"
+        )
+
+    for symbol in (request.symbolA, request.symbolB):
+        if symbol.lower() not in binance_client.symbols:
+            raise HTTPException(status_code=400, detail=f"Unknown symbol '{symbol}'")
+    if request.regressionType not in REGRESSION_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown regression type '{request.regressionType}'")
+    params_error = zscore_params_error(request.window, request.halflife)
+    if params_error:
+        raise HTTPException(status_code=400, detail=params_error)
+
+    try:
+        rule = signal_engine.add_rule(
+            symbol_a=request.symbolA,
+            symbol_b=request.symbolB,
+            metric=request.metric,
+            condition=request.condition,
+            threshold=request.threshold,
+            regression_type=request.regressionType,
+            window=request.window,
+            halflife=request.halflife,
+            name=request.name
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"Signal rule {rule.rule_id} registered: {rule.name}")
+    return rule.to_dict()
+
+
+@router.get("/rules")
+async def list_rules():
+    _, signal_engine = _get_engine()
+    return {
+        "count": len(signal_engine.rules),
+        "rules": [rule.to_dict() for rule in signal_engine.rules.values()]
+    }
+
+
+@router.delete("/rules/{rule_id}")
+async def delete_rule(rule_id: int):
+    _, signal_engine = _get_engine()
+    if not signal_engine.remove_rule(rule_id):
+        raise HTTPException(status_code=404, detail=f"Rule {rule_id} not found")
+    return {"deleted": rule_id}
+
+
+@router.get("/history")
+async def signal_history(limit: int = 100):
+    _, signal_engine = _get_engine()
+    signals = signal_engine.get_history(max(limit, 0))
+    return {
+        "count": len(signals),
+        "signals": signals
+    }
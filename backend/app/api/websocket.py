@@ -1,20 +1,26 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Set
+from typing import List, Optional, Set
 import asyncio
-import json
 import logging
 
+from app.services import metrics
+from app.api.analytics import zscore_params_error
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 active_connections: Set[WebSocket] = set()
+signal_connections: Set[WebSocket] = set()
+# Strong references to in-flight signal broadcasts so they aren't collected early
+_broadcast_tasks: Set[asyncio.Task] = set()
 
 
 @router.websocket("/live")
 async def websocket_live_data(websocket: WebSocket):
     await websocket.accept()
     active_connections.add(websocket)
+    metrics.WEBSOCKET_CONNECTIONS.inc(endpoint="live")
     logger.info(f"WebSocket client connected. Total connections: {len(active_connections)}")
 
     try:
@@ -26,14 +32,14 @@ async def websocket_live_data(websocket: WebSocket):
                 'prices': binance_client.get_all_prices(),
                 'message': 'Connected to live data stream'
             }
-            await websocket.send_text(json.dumps(initial_data))
+            await metrics.send_text(websocket, initial_data, endpoint="live")
 
         while True:
             try:
                 try:
                     data = await asyncio.wait_for(websocket.receive_text(), timeout=0.1)
                     if data == "ping":
-                        await websocket.send_text("pong")
+                        await metrics.send_text(websocket, "pong", endpoint="live")
                 except asyncio.TimeoutError:
                     pass
 
@@ -60,7 +66,7 @@ async def websocket_live_data(websocket: WebSocket):
                         'volumes': volumes
                     }
 
-                    await websocket.send_text(json.dumps(update))
+                    await metrics.send_text(websocket, update, endpoint="live")
 
                 await asyncio.sleep(1)
 
@@ -76,12 +82,25 @@ async def websocket_live_data(websocket: WebSocket):
 
     finally:
         active_connections.discard(websocket)
+        metrics.WEBSOCKET_CONNECTIONS.dec(endpoint="live")
         logger.info(f"WebSocket client removed. Total connections: {len(active_connections)}")
 
 
 @router.websocket("/analytics/{symbol_a}/{symbol_b}")
-async def websocket_analytics_stream(websocket: WebSocket, symbol_a: str, symbol_b: str):
+async def websocket_analytics_stream(
+    websocket: WebSocket,
+    symbol_a: str,
+    symbol_b: str,
+    window: int = 20,
+    halflife: Optional[float] = None
+):
+    params_error = zscore_params_error(window, halflife)
+    if params_error:
+        await websocket.close(code=1008, reason=params_error)
+        return
+
     await websocket.accept()
+    metrics.WEBSOCKET_CONNECTIONS.inc(endpoint="analytics")
     logger.info(f"Analytics WebSocket connected for {symbol_a}/{symbol_b}")
 
     try:
@@ -102,7 +121,7 @@ async def websocket_analytics_stream(websocket: WebSocket, symbol_a: str, symbol
                         if min_len >= 20:
                             beta = analytics_service.compute_hedge_ratio(prices_a[:min_len], prices_b[:min_len])
                             spread = analytics_service.compute_spread(prices_a[:min_len], prices_b[:min_len], beta)
-                            zscore = analytics_service.compute_zscore(spread)
+                            zscore = analytics_service.compute_zscore(spread, window, halflife)
                             correlation = analytics_service.compute_correlation(prices_a[:min_len], prices_b[:min_len])
 
                             update = {
@@ -116,7 +135,7 @@ async def websocket_analytics_stream(websocket: WebSocket, symbol_a: str, symbol
                                 'current_zscore': float(zscore[-1])
                             }
 
-                            await websocket.send_text(json.dumps(update))
+                            await metrics.send_text(websocket, update, endpoint="analytics")
 
                 await asyncio.sleep(2)
 
@@ -130,17 +149,71 @@ async def websocket_analytics_stream(websocket: WebSocket, symbol_a: str, symbol
     except Exception as e:
         logger.error(f"Analytics WebSocket error: {e}")
 
+    finally:
+        metrics.WEBSOCKET_CONNECTIONS.dec(endpoint="analytics")
 
-async def broadcast_message(message: dict):
-    if active_connections:
-        message_text = json.dumps(message)
-        disconnected = set()
 
-        for connection in active_connections:
-            try:
-                await connection.send_text(message_text)
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected.add(connection)
+@router.websocket("/signals")
+async def websocket_signals(websocket: WebSocket):
+    await websocket.accept()
+    signal_connections.add(websocket)
+    metrics.WEBSOCKET_CONNECTIONS.inc(endpoint="signals")
+    logger.info(f"Signals WebSocket connected. Total connections: {len(signal_connections)}")
 
-        active_connections.difference_update(disconnected)
+    try:
+        from app.main import signal_engine
+
+        if signal_engine:
+            initial_data = {
+                'type': 'initial',
+                'signals': signal_engine.get_history(),
+                'message': 'Connected to signal stream'
+            }
+            await metrics.send_text(websocket, initial_data, endpoint="signals")
+
+        # Signals are pushed by publish_signals; this loop only serves pings
+        # and notices the disconnect
+        while True:
+            data = await websocket.receive_text()
+            if data == "ping":
+                await metrics.send_text(websocket, "pong", endpoint="signals")
+
+    except WebSocketDisconnect:
+        logger.info("Signals WebSocket client disconnected")
+    except Exception as e:
+        logger.error(f"Signals WebSocket error: {e}")
+
+    finally:
+        signal_connections.discard(websocket)
+        metrics.WEBSOCKET_CONNECTIONS.dec(endpoint="signals")
+
+
+def publish_signals(signals: List[dict]):
+    # SignalEngine listener; runs inside the ingest callback, so sending is
+    # handed to a task instead of awaited
+    if signal_connections:
+        message = {'type': 'signals', 'signals': signals}
+        task = asyncio.get_running_loop().create_task(
+            _broadcast(signal_connections, message, endpoint="signals")
+        )
+        _broadcast_tasks.add(task)
+        task.add_done_callback(_broadcast_tasks.discard)
+
+
+async def _broadcast(connections: Set[WebSocket], message: dict, endpoint: str):
+    message_text = metrics.json_dumps(message, endpoint=endpoint)
+    disconnected = set()
+
+    for connection in list(connections):
+        try:
+            await metrics.send_text(connection, message_text, endpoint=endpoint)
+        except Exception as e:
+            logger.error(f"Error broadcasting to client: {e}")
+            disconnected.add(connection)
+
+    connections.difference_update(disconnected)
+
+
+async def broadcast_message(message: dict):
+    if active_connections:
+        await _broadcast(active_connections, message, endpoint="broadcast")
@@ -0,0 +1,64 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _get_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# "live" streams from Binance, "replay" feeds recorded messages through the same pipeline
+DATA_SOURCE = os.getenv("DATA_SOURCE", "live").lower()
+
+# When set, the live client writes every raw stream message to gzip files in this directory
+RECORD_DIR = os.getenv("RECORD_DIR") or None
+
+# Recordings are flushed this often, and a new file is started this often (0 = never)
+RECORD_FLUSH_SECONDS = float(os.getenv("RECORD_FLUSH_SECONDS", "1.0"))
+RECORD_ROTATE_MINUTES = float(os.getenv("RECORD_ROTATE_MINUTES", "60"))
+
+# Recording file or directory of recordings to replay
+REPLAY_PATH = os.getenv("REPLAY_PATH") or None
+
+# 1.0 = real time, N = N times faster, 0 = as fast as possible
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", "1.0"))
+
+REPLAY_LOOP = _get_bool("REPLAY_LOOP")
+
+# Requests slower than this many milliseconds get a pyinstrument profile (0 disables)
+PROFILE_SLOW_REQUESTS_MS = float(os.getenv("PROFILE_SLOW_REQUESTS_MS", "0"))
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+# Processes for analytics that can't be vectorized (Kalman, Huber, Theil-Sen); 0 runs them inline
+ANALYTICS_WORKERS = int(os.getenv("ANALYTICS_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Import pandas/scipy/statsmodels/sklearn and exercise every analytics method before serving
+ANALYTICS_WARMUP = _get_bool("ANALYTICS_WARMUP")
+
+# "local": this process owns the Binance connection (single worker).
+# "shared": read market data from the segment written by `python -m app.ingest`.
+MARKET_DATA_MODE = os.getenv("MARKET_DATA_MODE", "local").lower()
+
+SHARED_MEMORY_NAME = os.getenv("SHARED_MEMORY_NAME", "pairs_market")
+
+# API worker processes started by app.py; above 1 it also starts the ingest process
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1"))
+
+# Port (0 disables) on which the ingest process serves its own /metrics; in
+# shared mode the binance_* ingest metrics are only produced there
+INGEST_METRICS_HOST = os.getenv("INGEST_METRICS_HOST", "0.0.0.0")
+INGEST_METRICS_PORT = int(os.getenv("INGEST_METRICS_PORT", "8001"))
+
+# Signal rule engine: most rules that can be registered, and fired signals kept for /api/signals/history
+SIGNAL_MAX_RULES = int(os.getenv("SIGNAL_MAX_RULES", "10000"))
+SIGNAL_HISTORY_SIZE = int(os.getenv("SIGNAL_HISTORY_SIZE", "1000"))
+
+# Serialized REST responses kept for repeat requests (keyed by ETag), and the
+# max-age sent with them; at 0 clients and proxies revalidate every time
+HTTP_CACHE_ENTRIES = int(os.getenv("HTTP_CACHE_ENTRIES", "256"))
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import signal
+
+from aiohttp import web
+
+from app import config
+from app.api.metrics import CONTENT_TYPE, render_metrics
+from app.services.market_data import create_ingest_client
+from app.services.shared_market import SharedMarketWriter
+
+logger = logging.getLogger(__name__)
+
+
+async def start_metrics_server(client) -> web.AppRunner:
+    # In shared mode _process_message only runs here, so the binance_* metrics
+    # are served by this process on their own port
+    async def handle_metrics(request):
+        return web.Response(body=render_metrics(client).encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, config.INGEST_METRICS_HOST, config.INGEST_METRICS_PORT).start()
+    logger.info(f"Ingest metrics on http://{config.INGEST_METRICS_HOST}:{config.INGEST_METRICS_PORT}/metrics")
+    return runner
+
+
+async def run_ingest():
+    client = create_ingest_client()
+    capacity = next(iter(client.ohlc_data.values())).maxlen
+    writer = SharedMarketWriter(config.SHARED_MEMORY_NAME, client.symbols, capacity=capacity)
+    client.shared = writer
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    logger.info("Starting market data ingest process...")
+    metrics_runner = None
+    if config.INGEST_METRICS_PORT:
+        try:
+            metrics_runner = await start_metrics_server(client)
+        except OSError as e:
+            logger.error(f"Could not start ingest metrics server: {e}")
+    start_task = asyncio.create_task(client.start())
+
+    try:
+        while not stop.is_set():
+            writer.heartbeat()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=1)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        logger.info("Stopping market data ingest process...")
+        start_task.cancel()
+        await client.stop()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        writer.close()
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    try:
+        asyncio.run(run_ingest())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
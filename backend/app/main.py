@@ -1,12 +1,15 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import asyncio
 import logging
 
-from app.services.binance_client import BinanceWebSocketClient
-from app.services.analytics_service import AnalyticsService
-from app.api import analytics, websocket
+from app.services.analytics_service import AnalyticsService, HEAVY_MODULES
+from app.services.market_data import create_market_client
+from app.services.signals import SignalEngine
+from app.services import runtime, workers
+from app.api import analytics, websocket, metrics, signals, http_cache
+from app import config
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,25 +19,40 @@ logger = logging.getLogger(__name__)
 
 binance_client = None
 analytics_service = None
+signal_engine = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global binance_client, analytics_service
+    global binance_client, analytics_service, signal_engine
 
     logger.info("Starting backend services...")
 
-    binance_client = BinanceWebSocketClient()
+    binance_client = create_market_client()
     analytics_service = AnalyticsService()
 
+    signal_engine = SignalEngine(
+        analytics_service,
+        binance_client,
+        history_size=config.SIGNAL_HISTORY_SIZE,
+        max_rules=config.SIGNAL_MAX_RULES
+    )
+    signal_engine.listeners.append(websocket.publish_signals)
+    binance_client.candle_listeners.append(signal_engine.on_candle_closed)
+
     asyncio.create_task(binance_client.start())
 
+    if config.ANALYTICS_WARMUP:
+        await asyncio.get_running_loop().run_in_executor(None, analytics_service.warm_up)
+
     logger.info("Backend services started successfully")
+    logger.info(runtime.startup_report(HEAVY_MODULES))
 
     yield
 
     logger.info("Shutting down backend services...")
     await binance_client.stop()
+    workers.shutdown()
     logger.info("Backend services stopped")
 app = FastAPI(
     title="Pairs Trading Analytics API",
@@ -51,7 +69,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(metrics.MetricsMiddleware)
+
+app.include_router(metrics.router, tags=["metrics"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(signals.router, prefix="/api/signals", tags=["signals"])
 app.include_router(websocket.router, prefix="/ws", tags=["websocket"])
 
 
@@ -94,13 +116,18 @@ async def test_prices():
 
 
 @app.get("/api/test/ohlc/{symbol}")
-async def test_ohlc(symbol: str):
+async def test_ohlc(symbol: str, request: Request):
     if not binance_client:
         return {"error": "Binance client not initialized"}
 
+    etag = http_cache.make_etag("test-ohlc", binance_client, [symbol], {"symbol": symbol})
+    cached = http_cache.cached_response(request, etag, "test-ohlc")
+    if cached is not None:
+        return cached
+
     ohlc_data = binance_client.get_ohlc(symbol, count=10)
-    return {
+    return http_cache.json_response(etag, {
         "symbol": symbol,
         "count": len(ohlc_data),
         "data": ohlc_data
-    }
+    })
@@ -1,14 +1,31 @@
 import numpy as np
-import pandas as pd
-from scipy import stats
-from statsmodels.tsa.stattools import adfuller
-from sklearn.linear_model import HuberRegressor, TheilSenRegressor
 from typing import Dict, List, Tuple, Optional
+import importlib
 import logging
 import math
+import time
+
+from app.services.metrics import ANALYTICS_SECONDS, timed
+from app.services.rolling import rolling_zscore
+from app.services.diagnostics import (
+    adf_max_lag, adf_pvalues, hurst_exponent, johansen_test, ou_half_life, rolling_adf, rolling_ols
+)
 
 logger = logging.getLogger(__name__)
 
+# pandas, scipy, statsmodels and scikit-learn cost seconds of import time and
+# ~100MB RSS, so they are imported inside the methods that need them. A worker
+# serving only OLS / z-scores / the live feed never loads them; warm_up() loads
+# them eagerly when first-request latency matters more than startup.
+HEAVY_MODULES = [
+    "pandas",
+    "scipy.stats",
+    "scipy.signal",
+    "statsmodels.tsa.stattools",
+    "statsmodels.tsa.coint_tables",
+    "sklearn.linear_model",
+]
+
 
 def sanitize_float(value: float) -> float:
     if math.isnan(value) or math.isinf(value):
@@ -20,11 +37,62 @@ def sanitize_array(arr: np.ndarray) -> List[float]:
     return [sanitize_float(float(x)) for x in arr]
 
 
+def optional_float(value: float) -> Optional[float]:
+    # For diagnostics where 0.0 would be a misleading stand-in (a half-life of
+    # 0 means instant reversion), undefined values are reported as null
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def johansen_summary(result: Dict[str, np.ndarray], row: Optional[int] = None) -> Optional[Dict]:
+    # JSON view of one basket from compute_johansen_test (row selects it from a
+    # stacked result); None for a degenerate basket, whose row is NaN, rather
+    # than zeros that would read as a real "not cointegrated" result
+    def pick(key):
+        return result[key] if row is None else result[key][row]
+
+    if np.isnan(pick('eigenvalues')).any():
+        return None
+
+    vectors = pick('vectors')
+    first = vectors[:, 0]
+    return {
+        'eigenvalues': sanitize_array(pick('eigenvalues')),
+        'trace_statistic': sanitize_array(pick('trace_statistic')),
+        'critical_values_95': sanitize_array(result['critical_values_trace'][:, 1]),
+        'rank': int(pick('rank')),
+        'is_cointegrated': bool(pick('rank') > 0),
+        # First cointegrating vector scaled so the first leg has weight 1
+        'weights': sanitize_array(first / first[0]) if first[0] else sanitize_array(first)
+    }
+
+
 class AnalyticsService:
     def __init__(self):
         self.hedge_ratios: Dict[str, float] = {}
         self.spread_history: Dict[str, List[float]] = {}
 
+    def warm_up(self) -> float:
+        # Import the heavy dependencies and run every method once on a small
+        # synthetic pair so the first real request doesn't pay for it
+        started = time.perf_counter()
+        for module in HEAVY_MODULES:
+            importlib.import_module(module)
+
+        rng = np.random.default_rng(0)
+        prices_b = 100.0 + np.cumsum(rng.normal(0, 1, 60))
+        prices_a = 2.0 * prices_b + rng.normal(0, 1, 60)
+        timestamps = [str(i) for i in range(60)]
+        for method in ("ols", "kalman", "huber", "theilsen"):
+            self.compute_full_analytics(prices_a.tolist(), prices_b.tolist(), timestamps, method)
+        self.compute_zscore(prices_a, halflife=10)
+        self.compute_correlation_matrix({"a": prices_a.tolist(), "b": prices_b.tolist()})
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Analytics warm-up completed in {elapsed:.2f}s")
+        return elapsed
+
+    @timed(ANALYTICS_SECONDS, method="compute_ols_regression")
     def compute_ols_regression(self, y: np.ndarray, x: np.ndarray) -> Tuple[float, float]:
         try:
             x_with_const = np.column_stack([np.ones(len(x)), x])
@@ -35,6 +103,7 @@ class AnalyticsService:
             logger.error(f"OLS regression error: {e}")
             return 1.0, 0.0
 
+    @timed(ANALYTICS_SECONDS, method="compute_kalman_filter")
     def compute_kalman_filter(self, y: np.ndarray, x: np.ndarray) -> float:
         try:
             delta = 1e-5
@@ -65,8 +134,10 @@ class AnalyticsService:
             logger.error(f"Kalman filter error: {e}")
             return 1.0
 
+    @timed(ANALYTICS_SECONDS, method="compute_huber_regression")
     def compute_huber_regression(self, y: np.ndarray, x: np.ndarray) -> float:
         try:
+            from sklearn.linear_model import HuberRegressor
             model = HuberRegressor()
             model.fit(x.reshape(-1, 1), y)
             return model.coef_[0]
@@ -75,8 +146,10 @@ class AnalyticsService:
             logger.error(f"Huber regression error: {e}")
             return 1.0
 
+    @timed(ANALYTICS_SECONDS, method="compute_theilsen_regression")
     def compute_theilsen_regression(self, y: np.ndarray, x: np.ndarray) -> float:
         try:
+            from sklearn.linear_model import TheilSenRegressor
             model = TheilSenRegressor()
             model.fit(x.reshape(-1, 1), y)
             return model.coef_[0]
@@ -85,6 +158,7 @@ class AnalyticsService:
             logger.error(f"Theil-Sen regression error: {e}")
             return 1.0
 
+    @timed(ANALYTICS_SECONDS, method="compute_hedge_ratio")
     def compute_hedge_ratio(
         self,
         prices_a: List[float],
@@ -108,6 +182,7 @@ class AnalyticsService:
             beta, _ = self.compute_ols_regression(y, x)
             return beta
 
+    @timed(ANALYTICS_SECONDS, method="compute_spread")
     def compute_spread(
         self,
         prices_a: List[float],
@@ -116,22 +191,153 @@ class AnalyticsService:
     ) -> np.ndarray:
         return np.array(prices_a) - beta * np.array(prices_b)
 
-    def compute_zscore(self, spread: np.ndarray, window: int = 20) -> np.ndarray:
+    @timed(ANALYTICS_SECONDS, method="compute_zscore")
+    def compute_zscore(
+        self,
+        spread: np.ndarray,
+        window: int = 20,
+        halflife: Optional[float] = None
+    ) -> np.ndarray:
+        # Rolling (or EWMA when halflife is set) z-score along the last axis, so a
+        # (pairs x time) matrix of spreads is scored in one call
+        try:
+            return rolling_zscore(spread, window=window, halflife=halflife)
+
+        except Exception as e:
+            logger.error(f"Z-score calculation error: {e}")
+            return np.zeros_like(np.asarray(spread, dtype=float))
+
+    @timed(ANALYTICS_SECONDS, method="compute_ols_regression_batch")
+    def compute_ols_regression_batch(self, y: np.ndarray, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Row-wise y_i = alpha_i + beta_i * x_i for stacked (pairs x time) matrices
+        x_mean = x.mean(axis=1, keepdims=True)
+        y_mean = y.mean(axis=1, keepdims=True)
+        dx = x - x_mean
+        var_x = np.einsum('ij,ij->i', dx, dx)
+        cov_xy = np.einsum('ij,ij->i', dx, y - y_mean)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            beta = np.where(var_x > 0, cov_xy / var_x, 1.0)
+        alpha = y_mean[:, 0] - beta * x_mean[:, 0]
+        return beta, alpha
+
+    @timed(ANALYTICS_SECONDS, method="compute_correlation_batch")
+    def compute_correlation_batch(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        da = a - a.mean(axis=1, keepdims=True)
+        db = b - b.mean(axis=1, keepdims=True)
+        denom = np.sqrt(np.einsum('ij,ij->i', da, da) * np.einsum('ij,ij->i', db, db))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(denom > 0, np.einsum('ij,ij->i', da, db) / denom, 0.0)
+
+    @timed(ANALYTICS_SECONDS, method="compute_half_life")
+    def compute_half_life(self, spread: np.ndarray) -> np.ndarray:
+        # OU half-life in candles along the last axis; NaN when not mean reverting
         try:
-            df = pd.DataFrame({'spread': spread})
-            rolling_mean = df['spread'].rolling(window=window, min_periods=1).mean()
-            rolling_std = df['spread'].rolling(window=window, min_periods=1).std()
-            rolling_std = rolling_std.replace(0, 1e-8)
+            return ou_half_life(spread)
 
-            zscore = (df['spread'] - rolling_mean) / rolling_std
-            return zscore.values
+        except Exception as e:
+            logger.error(f"Half-life calculation error: {e}")
+            return np.full(np.shape(spread)[:-1], np.nan)
+
+    @timed(ANALYTICS_SECONDS, method="compute_hurst_exponent")
+    def compute_hurst_exponent(self, spread: np.ndarray) -> np.ndarray:
+        try:
+            return hurst_exponent(spread)
 
         except Exception as e:
-            logger.error(f"Z-score calculation error: {e}")
-            return np.zeros(len(spread))
+            logger.error(f"Hurst exponent calculation error: {e}")
+            return np.full(np.shape(spread)[:-1], np.nan)
 
+    @timed(ANALYTICS_SECONDS, method="compute_johansen_test")
+    def compute_johansen_test(
+        self,
+        series: np.ndarray,
+        det_order: int = 0,
+        k_ar_diff: int = 1
+    ) -> Optional[Dict[str, np.ndarray]]:
+        # series is (legs x time), or (baskets x legs x time) to test many at once
+        series = np.asarray(series, dtype=float)
+        try:
+            return johansen_test(series, det_order, k_ar_diff)
+        except np.linalg.LinAlgError as e:
+            if series.ndim < 3:
+                logger.error(f"Johansen test error: {e}")
+                return None
+
+        # A single degenerate basket (e.g. a flat series) breaks the stacked
+        # factorisations; test the baskets one by one and leave those as NaN
+        rows = []
+        for basket in series:
+            try:
+                rows.append(johansen_test(basket, det_order, k_ar_diff))
+            except np.linalg.LinAlgError:
+                rows.append(None)
+
+        template = next((row for row in rows if row is not None), None)
+        if template is None:
+            logger.error("Johansen test error: every basket is degenerate")
+            return None
+
+        result = {}
+        for key, value in template.items():
+            if key.startswith('critical_values'):
+                result[key] = value
+                continue
+            filler = np.zeros_like(value) if key == 'rank' else np.full_like(value, np.nan)
+            result[key] = np.stack([row[key] if row is not None else filler for row in rows])
+        return result
+
+    @timed(ANALYTICS_SECONDS, method="compute_rolling_cointegration")
+    def compute_rolling_cointegration(
+        self,
+        prices_a: List[float],
+        prices_b: List[float],
+        regression_type: str = "ols",
+        window: int = 50,
+        stride: int = 1,
+        lags: Optional[int] = None
+    ) -> Optional[Dict]:
+        # Rolling ADF of the spread plus rolling hedge ratio / residual variance,
+        # one value per window ending at index window - 1 + i * stride
+        # (windows that are constant or collinear, e.g. flat prices, come back
+        # as NaN); None when the series as a whole is degenerate
+        try:
+            from statsmodels.tsa.adfvalues import mackinnoncrit
+            from statsmodels.tsa.stattools import adfuller
+
+            beta = self.compute_hedge_ratio(prices_a, prices_b, regression_type)
+            spread = self.compute_spread(prices_a, prices_b, beta)
+
+            if lags is None:
+                # Chosen once by AIC over the whole spread, then fixed for every
+                # window instead of re-running the lag search per window
+                lags = int(adfuller(spread, maxlag=adf_max_lag(window), autolag='AIC')[2])
+
+            adf = rolling_adf(spread, window, lags, stride)
+            ols = rolling_ols(prices_a, prices_b, window, stride)
+            pvalues = adf_pvalues(adf['statistic'])
+            critical_values = mackinnoncrit(N=1, regression='c', nobs=adf['nobs'])
+
+            return {
+                'hedge_ratio': beta,
+                'lags': lags,
+                'window_end': adf['starts'] + window - 1,
+                'adf_statistic': adf['statistic'],
+                'adf_pvalue': pvalues,
+                'critical_values': dict(zip(('1%', '5%', '10%'), critical_values)),
+                'rolling_hedge_ratio': ols['beta'],
+                'residual_variance': ols['residual_variance']
+            }
+
+        except Exception as e:
+            logger.error(f"Rolling cointegration error: {e}")
+            return None
+
+    @timed(ANALYTICS_SECONDS, method="compute_adf_test")
     def compute_adf_test(self, spread: np.ndarray) -> Dict[str, float]:
         try:
+            from statsmodels.tsa.stattools import adfuller
             result = adfuller(spread, autolag='AIC')
 
             return {
@@ -150,12 +356,14 @@ class AnalyticsService:
                 'is_stationary': False
             }
 
+    @timed(ANALYTICS_SECONDS, method="compute_correlation")
     def compute_correlation(
         self,
         prices_a: List[float],
         prices_b: List[float]
     ) -> float:
         try:
+            from scipy import stats
             correlation, _ = stats.pearsonr(prices_a, prices_b)
             return correlation
 
@@ -163,11 +371,13 @@ class AnalyticsService:
             logger.error(f"Correlation calculation error: {e}")
             return 0.0
 
+    @timed(ANALYTICS_SECONDS, method="compute_correlation_matrix")
     def compute_correlation_matrix(
         self,
         price_data: Dict[str, List[float]]
     ) -> Dict[str, Dict[str, float]]:
         try:
+            import pandas as pd
             df = pd.DataFrame(price_data)
             corr_matrix = df.corr()
 
@@ -183,19 +393,25 @@ class AnalyticsService:
             logger.error(f"Correlation matrix error: {e}")
             return {}
 
+    @timed(ANALYTICS_SECONDS, method="compute_full_analytics")
     def compute_full_analytics(
         self,
         prices_a: List[float],
         prices_b: List[float],
         timestamps: List[str],
-        regression_type: str = "ols"
+        regression_type: str = "ols",
+        window: int = 20,
+        halflife: Optional[float] = None
     ) -> Dict:
         try:
             beta = self.compute_hedge_ratio(prices_a, prices_b, regression_type)
             spread = self.compute_spread(prices_a, prices_b, beta)
-            zscore = self.compute_zscore(spread)
+            zscore = self.compute_zscore(spread, window, halflife)
             correlation = self.compute_correlation(prices_a, prices_b)
             adf_result = self.compute_adf_test(spread)
+            half_life = self.compute_half_life(spread)
+            hurst = self.compute_hurst_exponent(spread)
+            johansen = self.compute_johansen_test(np.array([prices_a, prices_b]))
             spread_mean = np.mean(spread)
             spread_std = np.std(spread)
 
@@ -210,7 +426,9 @@ class AnalyticsService:
                 },
                 'zscore': {
                     'values': sanitize_array(zscore),
-                    'current': sanitize_float(zscore[-1]) if len(zscore) > 0 else 0.0
+                    'current': sanitize_float(zscore[-1]) if len(zscore) > 0 else 0.0,
+                    'window': window,
+                    'halflife': halflife
                 },
                 'correlation': sanitize_float(correlation),
                 'adf_test': {
@@ -218,7 +436,10 @@ class AnalyticsService:
                     'pvalue': sanitize_float(adf_result['pvalue']),
                     'is_stationary': bool(adf_result['is_stationary']),
                     'critical_values': {k: sanitize_float(v) for k, v in adf_result['critical_values'].items()}
-                }
+                },
+                'half_life': optional_float(half_life),
+                'hurst_exponent': optional_float(hurst),
+                'johansen': johansen_summary(johansen) if johansen else None
             }
 
         except Exception as e:
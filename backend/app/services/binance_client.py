@@ -1,16 +1,22 @@
 import asyncio
 import json
 import logging
-from typing import Dict, List, Optional
+import time
+from typing import Callable, Dict, List, Optional
 from datetime import datetime, timedelta
 from collections import deque
 import aiohttp
 
+from app.services import metrics
+
 logger = logging.getLogger(__name__)
 
 
 class BinanceWebSocketClient:
-    def __init__(self):
+    # Exchange-to-ingest lag is only meaningful for messages arriving live
+    measure_ingest_lag = True
+
+    def __init__(self, recorder=None, shared=None):
         self.ws_url = "wss://stream.binance.com:9443/ws"
         self.rest_url = "https://api.binance.com/api/v3"
         self.symbols = ["btcusdt", "ethusdt", "bnbusdt", "solusdt"]
@@ -21,6 +27,11 @@ class BinanceWebSocketClient:
         self.session: Optional[aiohttp.ClientSession] = None
         self.websocket: Optional[aiohttp.ClientWebSocketResponse] = None
         self.tasks: List[asyncio.Task] = []
+        self.recorder = recorder
+        # SharedMarketWriter mirroring the buffers for API workers in other processes
+        self.shared = shared
+        # Called with (symbol, candle) whenever a live candle closes
+        self.candle_listeners: List[Callable[[str, dict], None]] = []
 
     async def start(self):
         self.is_running = True
@@ -57,6 +68,11 @@ class BinanceWebSocketClient:
                             }
                             self.ohlc_data[symbol].append(ohlc)
                             self.prices[symbol] = float(candle[4])
+                            if self.shared:
+                                self.shared.append_candle(symbol, candle[0], ohlc)
+                                self.shared.set_ticker(symbol, float(candle[4]))
+                            if self.recorder:
+                                self.recorder.record_candle(symbol, candle)
 
                         logger.info(f"✓ Loaded {len(data)} historical candles for {symbol.upper()}")
                     else:
@@ -95,6 +111,8 @@ class BinanceWebSocketClient:
         try:
             async for msg in self.websocket:
                 if msg.type == aiohttp.WSMsgType.TEXT:
+                    if self.recorder:
+                        self.recorder.record(msg.data)
                     data = json.loads(msg.data)
                     await self._process_message(data)
                 elif msg.type == aiohttp.WSMsgType.ERROR:
@@ -109,14 +127,16 @@ class BinanceWebSocketClient:
                 await self._connect_and_subscribe()
 
     async def _process_message(self, data: dict):
+        started = time.perf_counter()
+        event_type = data.get("e")
         try:
-            event_type = data.get("e")
-
             if event_type == "24hrMiniTicker":
                 symbol = data.get("s", "").lower()
                 if symbol in self.symbols:
                     self.prices[symbol] = float(data.get("c", 0))
                     self.volumes[symbol] = float(data.get("v", 0))
+                    if self.shared:
+                        self.shared.set_ticker(symbol, self.prices[symbol], self.volumes[symbol])
 
             elif event_type == "kline":
                 kline = data.get("k", {})
@@ -132,10 +152,22 @@ class BinanceWebSocketClient:
                         "volume": float(kline["v"])
                     }
                     self.ohlc_data[symbol].append(ohlc)
+                    if self.shared:
+                        self.shared.append_candle(symbol, kline["t"], ohlc)
+                    for listener in self.candle_listeners:
+                        listener(symbol, ohlc)
                     logger.debug(f"New candle for {symbol.upper()}: close={ohlc['close']}")
 
         except Exception as e:
             logger.error(f"Error processing message: {e}")
+        finally:
+            now = time.time()
+            metrics.BINANCE_PROCESSING_SECONDS.observe(time.perf_counter() - started)
+            metrics.BINANCE_MESSAGES.inc(event=event_type or "unknown")
+            metrics.BINANCE_LAST_MESSAGE.set(now)
+            event_time = data.get("E")
+            if self.measure_ingest_lag and event_time:
+                metrics.BINANCE_INGEST_LAG_SECONDS.observe(max(now - event_time / 1000, 0.0), event=event_type)
 
     def get_price(self, symbol: str) -> Optional[float]:
         return self.prices.get(symbol.lower())
@@ -147,6 +179,13 @@ class BinanceWebSocketClient:
             return data_list[-count:] if len(data_list) > count else data_list
         return []
 
+    def get_candle_version(self, symbol: str) -> str:
+        # Changes whenever the symbol's candle buffer does; used for HTTP ETags
+        candles = self.ohlc_data.get(symbol.lower())
+        if not candles:
+            return "0"
+        return f"{len(candles)}:{candles[-1]['timestamp']}"
+
     def get_volume(self, symbol: str) -> Optional[float]:
         return self.volumes.get(symbol.lower())
 
@@ -169,4 +208,7 @@ class BinanceWebSocketClient:
         if self.session:
             await self.session.close()
 
+        if self.recorder:
+            self.recorder.close()
+
         logger.info("Binance WebSocket client stopped")
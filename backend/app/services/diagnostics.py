@@ -0,0 +1,294 @@
+import math
+from typing import Dict
+
+import numpy as np
+
+
+# Mean-reversion diagnostics. Like rolling.py, every kernel works along the last
+# axis, so one spread and a (spreads x time) matrix share the same code path.
+
+HURST_MAX_LAG = 20
+
+# Rows are reduced in blocks of about this many values so the per-block
+# temporaries stay cache resident even for long stacked series
+BLOCK_ELEMENTS = 1 << 16
+
+# Column of the Johansen critical value tables holding the 95% level
+JOHANSEN_95 = 1
+
+# Rolling regressions: a variable whose in-window variance is below this
+# fraction of its mean square over the series is treated as constant (e.g. a
+# flat stretch of candles), and windows whose regressor correlation matrix has
+# a determinant below MIN_DETERMINANT as collinear. Both are reported as NaN.
+CONSTANT_TOLERANCE = 1e-10
+MIN_DETERMINANT = 1e-12
+
+
+def _row_blocks(x: np.ndarray):
+    # (slice, block) pairs over the rows of x flattened to (rows x time)
+    rows = x.reshape(-1, x.shape[-1])
+    step = max(BLOCK_ELEMENTS // max(x.shape[-1], 1), 1)
+    for start in range(0, rows.shape[0], step):
+        yield slice(start, start + step), rows[start:start + step]
+
+
+def ou_half_life(x: np.ndarray) -> np.ndarray:
+    # AR(1) fit x_t = c + phi * x_{t-1}, i.e. the same slope statsmodels OLS
+    # gives for diff(x) on [1, x_{t-1}] (plus one). Half-life of an OU process
+    # is -ln 2 / ln(phi); NaN where the spread doesn't revert (phi outside (0, 1)).
+    x = np.asarray(x, dtype=float)
+    phi = np.empty(int(np.prod(x.shape[:-1])))
+
+    for rows, block in _row_blocks(x):
+        lagged = block[:, :-1] - block[:, :-1].mean(axis=1, keepdims=True)
+        current = block[:, 1:] - block[:, 1:].mean(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            phi[rows] = np.einsum('ij,ij->i', lagged, current) / np.einsum('ij,ij->i', lagged, lagged)
+
+    phi = phi.reshape(x.shape[:-1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        half_life = -math.log(2) / np.log(phi)
+    return np.where((phi > 0) & (phi < 1), half_life, np.nan)
+
+
+def hurst_exponent(x: np.ndarray, max_lag: int = HURST_MAX_LAG) -> np.ndarray:
+    # Slope of log std(x_{t+lag} - x_t) against log lag: ~0.5 for a random walk,
+    # below for mean reversion, above for trending series. The lagged variances
+    # are reduced per row block, and the slope is a closed-form fit shared by
+    # every row since the lags are the same.
+    x = np.asarray(x, dtype=float)
+    lags = np.arange(2, min(max_lag, x.shape[-1] // 2) + 1)
+    if len(lags) < 2:
+        return np.full(x.shape[:-1], np.nan)
+
+    variance = np.empty((int(np.prod(x.shape[:-1])), len(lags)))
+    for rows, block in _row_blocks(x):
+        for column, lag in enumerate(lags):
+            diff = block[:, lag:] - block[:, :-lag]
+            mean = diff.mean(axis=1)
+            variance[rows, column] = np.einsum('ij,ij->i', diff, diff) / diff.shape[1] - mean * mean
+
+    log_lags = np.log(lags) - np.log(lags).mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # log std = log variance / 2
+        log_dispersion = 0.5 * np.log(np.maximum(variance, 0.0))
+        log_dispersion = log_dispersion - log_dispersion.mean(axis=-1, keepdims=True)
+        slope = (log_dispersion * log_lags).sum(axis=-1) / (log_lags * log_lags).sum()
+    return np.where(np.isfinite(slope), slope, np.nan).reshape(x.shape[:-1])
+
+
+def _detrend(y: np.ndarray, order: int) -> np.ndarray:
+    # Residuals of each column of (..., time, k) on a polynomial time trend,
+    # the same trend statsmodels' coint_johansen removes
+    if order < 0:
+        return y
+    q, _ = np.linalg.qr(np.vander(np.linspace(-1, 1, y.shape[-2]), order + 1))
+    return y - q @ (q.T @ y)
+
+
+def _residualize(y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    # y minus its least-squares projection on z, with one batched QR
+    if z.shape[-1] == 0:
+        return y
+    q, _ = np.linalg.qr(z)
+    return y - q @ (np.swapaxes(q, -1, -2) @ y)
+
+
+def johansen_test(series: np.ndarray, det_order: int = 0, k_ar_diff: int = 1) -> Dict[str, np.ndarray]:
+    # Johansen cointegration test for (..., legs, time) input, matching
+    # statsmodels.tsa.vector_ar.vecm.coint_johansen. Every step is a batched
+    # matrix operation, so many baskets of equal shape are tested in one call.
+    # The generalized eigenproblem is made symmetric through the Cholesky
+    # factor of S_kk and solved with eigh.
+    from statsmodels.tsa.coint_tables import c_sja, c_sjt
+
+    endog = np.swapaxes(np.asarray(series, dtype=float), -1, -2)
+    n_obs, legs = endog.shape[-2:]
+    trend = 0 if det_order > -1 else det_order
+
+    x = _detrend(endog, det_order)
+    dx = np.diff(x, axis=-2)
+    # Lagged differences [dx_{t-1}, ..., dx_{t-k}] aligned with dx_t
+    z = dx[..., k_ar_diff:, :0]
+    if k_ar_diff:
+        z = _detrend(np.concatenate(
+            [dx[..., k_ar_diff - lag:dx.shape[-2] - lag, :] for lag in range(1, k_ar_diff + 1)],
+            axis=-1
+        ), trend)
+
+    r0 = _residualize(_detrend(dx[..., k_ar_diff:, :], trend), z)
+    rk = _residualize(_detrend(x[..., 1:n_obs - k_ar_diff, :], trend), z)
+    t = rk.shape[-2]
+
+    rk_t = np.swapaxes(rk, -1, -2)
+    skk = rk_t @ rk / t
+    sk0 = rk_t @ r0 / t
+    s00 = np.swapaxes(r0, -1, -2) @ r0 / t
+
+    sig = sk0 @ np.linalg.solve(s00, np.swapaxes(sk0, -1, -2))
+    l_inv = np.linalg.inv(np.linalg.cholesky(skk))
+    l_inv_t = np.swapaxes(l_inv, -1, -2)
+    eigenvalues, eigenvectors = np.linalg.eigh(l_inv @ sig @ l_inv_t)
+    eigenvalues = eigenvalues[..., ::-1]
+    # Cointegrating vectors as columns, normalised so that v' S_kk v = I
+    vectors = l_inv_t @ eigenvectors[..., ::-1]
+
+    log_retained = np.log(1 - eigenvalues)
+    trace = -t * np.flip(np.cumsum(np.flip(log_retained, axis=-1), axis=-1), axis=-1)
+    max_eigen = -t * log_retained
+
+    critical_trace = np.array([c_sjt(legs - i, det_order) for i in range(legs)])
+    critical_max_eigen = np.array([c_sja(legs - i, det_order) for i in range(legs)])
+
+    # Sequential test: the rank is the first r whose trace statistic falls
+    # below its 95% critical value
+    rejected = trace > critical_trace[:, JOHANSEN_95]
+    rank = np.where(rejected.all(axis=-1), legs, np.argmin(rejected, axis=-1))
+
+    return {
+        'eigenvalues': eigenvalues,
+        'trace_statistic': trace,
+        'max_eigen_statistic': max_eigen,
+        'critical_values_trace': critical_trace,
+        'critical_values_max_eigen': critical_max_eigen,
+        'vectors': vectors,
+        'rank': rank
+    }
+
+
+def adf_max_lag(window: int) -> int:
+    # statsmodels' default maximum lag (Schwert rule) for a window of this
+    # length, capped so every window's regression keeps residual degrees of freedom
+    return max(min(int(math.ceil(12 * (window / 100) ** 0.25)), (window - 4) // 2), 0)
+
+
+def _window_starts(n: int, window: int, stride: int) -> np.ndarray:
+    return np.arange(0, n - window + 1, stride)
+
+
+def _window_sums(values: np.ndarray, length: int, starts: np.ndarray) -> np.ndarray:
+    # Sums of values[s:s + length] along the first axis for every start s. One
+    # cumulative sum serves all windows, so moving a window by one point costs
+    # one added and one dropped row instead of a fresh reduction.
+    cumulative = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+    return cumulative[starts + length] - cumulative[starts]
+
+
+def _degenerate_windows(sums: np.ndarray, rows: int, mean_squares: np.ndarray) -> np.ndarray:
+    # Windows of [regressors..., constant, y] cross-product sums where y or a
+    # regressor doesn't vary (compared with its mean square over the whole
+    # series, since running sums carry rounding of that size), or where the
+    # regressors are collinear once the constant is partialled out
+    k = sums.shape[-1] - 2
+    columns = [*range(k), k + 1]
+    totals = sums[:, columns, k]
+    cross = sums[:, columns][:, :, columns]
+    cov = cross - totals[:, :, None] * totals[:, None, :] / rows
+    variance = np.einsum('wii->wi', cov)
+
+    constant = (variance <= CONSTANT_TOLERANCE * rows * mean_squares[columns]).any(axis=1)
+    if k == 0:
+        return constant
+    cov = cov[:, :k, :k]
+    scale = np.sqrt(np.where(constant[:, None], 1.0, variance[:, :k]))
+    correlation = cov / (scale[:, :, None] * scale[:, None, :])
+    correlation = np.where(constant[:, None, None], np.eye(k), correlation)
+    # A correlation matrix has unit diagonal, so its determinant falls towards
+    # zero as the columns become collinear; a batched LU is far cheaper than
+    # the SVD a condition number needs
+    return constant | (np.abs(np.linalg.det(correlation)) < MIN_DETERMINANT)
+
+
+def rolling_adf(x: np.ndarray, window: int, lags: int, stride: int = 1) -> Dict[str, np.ndarray]:
+    # ADF t-statistics (constant, fixed lag order) of every window of x, equal
+    # to adfuller(x[s:s + window], maxlag=lags, autolag=None) per window. The
+    # regression rows of adjacent windows overlap, so their cross-products
+    # X'X, X'y and y'y come from running sums of per-row outer products and
+    # all windows are solved together as one batch of small systems.
+    x = np.asarray(x, dtype=float)
+    # The constant regressor absorbs any level shift; centring keeps the
+    # running sums small
+    x = x - x.mean()
+    n = len(x)
+    starts = _window_starts(n, window, stride)
+    rows = window - lags - 1
+    k = lags + 2
+    if len(starts) == 0 or rows - k < 1:
+        return {'statistic': np.empty(0), 'starts': starts, 'nobs': max(rows, 0)}
+
+    dx = np.diff(x)
+    # Row for time t: [x_{t-1}, dx_{t-1}, ..., dx_{t-lags}, 1 | dx_t]
+    design = np.column_stack(
+        [x[lags:n - 1]]
+        + [dx[lags - lag:n - 1 - lag] for lag in range(1, lags + 1)]
+        + [np.ones(n - lags - 1), dx[lags:]]
+    )
+
+    sums = _window_sums(design[:, :, None] * design[:, None, :], rows, starts)
+    xtx = sums[:, :k, :k]
+    xty = sums[:, :k, k]
+    yty = sums[:, k, k]
+
+    # A singular window would fail the whole batched inverse; those are swapped
+    # for the identity and their statistic set to NaN afterwards
+    mean_squares = np.mean(design * design, axis=0)
+    singular = _degenerate_windows(sums, rows, mean_squares)
+    xtx = np.where(singular[:, None, None], np.eye(k), xtx)
+
+    xtx_inv = np.linalg.inv(xtx)
+    beta = np.einsum('wij,wj->wi', xtx_inv, xty)
+    ssr = np.maximum(yty - np.einsum('wi,wi->w', beta, xty), 0.0)
+    # An exact fit has no residual variance to scale the t-statistic by
+    singular |= ssr <= CONSTANT_TOLERANCE * rows * mean_squares[k]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stderr = np.sqrt(ssr / (rows - k) * xtx_inv[:, 0, 0])
+        statistic = np.where(singular, np.nan, beta[:, 0] / stderr)
+
+    return {'statistic': statistic, 'starts': starts, 'nobs': rows}
+
+
+def adf_pvalues(statistic: np.ndarray) -> np.ndarray:
+    # Vectorized mackinnonp(stat, regression='c', N=1): scalar mackinnonp costs
+    # ~0.1ms per call, which dominates a rolling series. Uses statsmodels' own
+    # MacKinnon (1994) tables so both stay in step.
+    from scipy.special import ndtr
+    from statsmodels.tsa import adfvalues
+
+    statistic = np.asarray(statistic, dtype=float)
+    small = adfvalues._tau_smallps['c'][0]
+    large = adfvalues._tau_largeps['c'][0]
+
+    pvalues = np.where(
+        statistic <= adfvalues._tau_stars['c'][0],
+        ndtr(np.polynomial.polynomial.polyval(statistic, small)),
+        ndtr(np.polynomial.polynomial.polyval(statistic, large))
+    )
+    pvalues = np.where(statistic > adfvalues._tau_maxs['c'][0], 1.0, pvalues)
+    pvalues = np.where(statistic < adfvalues._tau_mins['c'][0], 0.0, pvalues)
+    return np.where(np.isnan(statistic), np.nan, pvalues)
+
+
+def rolling_ols(y: np.ndarray, x: np.ndarray, window: int, stride: int = 1) -> Dict[str, np.ndarray]:
+    # Per-window OLS of y on x with intercept: hedge ratio and residual
+    # variance, from running sums like rolling_adf
+    y = np.asarray(y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    y = y - y.mean()
+    x = x - x.mean()
+    starts = _window_starts(len(y), window, stride)
+    if len(starts) == 0:
+        return {'beta': np.empty(0), 'residual_variance': np.empty(0), 'starts': starts}
+
+    sums = _window_sums(np.column_stack([x, y, x * x, x * y, y * y]), window, starts)
+    sx, sy, sxx, sxy, syy = sums.T
+    var_x = sxx - sx * sx / window
+    cov_xy = sxy - sx * sy / window
+    var_y = syy - sy * sy / window
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = np.where(var_x > CONSTANT_TOLERANCE * window * np.mean(x * x), cov_xy / var_x, np.nan)
+        # With x flat nothing is explained, so the residual is all of y's variance
+        explained = np.where(np.isnan(beta), 0.0, beta * cov_xy)
+        residual_variance = np.maximum(var_y - explained, 0.0) / (window - 2)
+
+    return {'beta': beta, 'residual_variance': residual_variance, 'starts': starts}
@@ -0,0 +1,23 @@
+from app import config
+from app.services.binance_client import BinanceWebSocketClient
+from app.services.replay import MessageRecorder, ReplayBinanceClient
+from app.services.shared_market import SharedMarketClient
+
+
+def create_ingest_client() -> BinanceWebSocketClient:
+    # The client that owns the exchange connection (or replays a recording)
+    if config.DATA_SOURCE == "replay":
+        if not config.REPLAY_PATH:
+            raise RuntimeError("DATA_SOURCE=replay requires REPLAY_PATH")
+        return ReplayBinanceClient(config.REPLAY_PATH, speed=config.REPLAY_SPEED, loop=config.REPLAY_LOOP)
+
+    recorder = MessageRecorder(config.RECORD_DIR) if config.RECORD_DIR else None
+    return BinanceWebSocketClient(recorder=recorder)
+
+
+def create_market_client():
+    # What an API process serves from: its own ingest client, or in shared mode
+    # a read-only view of the segment written by the ingest process
+    if config.MARKET_DATA_MODE == "shared":
+        return SharedMarketClient(config.SHARED_MEMORY_NAME)
+    return create_ingest_client()
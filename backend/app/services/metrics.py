@@ -0,0 +1,232 @@
+import asyncio
+import functools
+import json
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+# Updates are plain dict/int operations without locks to keep the hot path cheap;
+# a rare lost increment from a worker thread is acceptable for monitoring.
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in self.values.items()]
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Optional[Callable[[], Dict[LabelKey, float]]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.values: Dict[LabelKey, float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        self.values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        values = self.callback() if self.callback else self.values
+        return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in values.items()]
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.children: Dict[LabelKey, _HistogramChild] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        child = self.children.get(key)
+        if child is None:
+            child = self.children[key] = _HistogramChild(len(self.buckets))
+        child.counts[bisect_left(self.buckets, value)] += 1
+        child.sum += value
+        child.count += 1
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, child in self.children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, child.counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._register(Counter(name, documentation))
+
+    def gauge(self, name: str, documentation: str, callback=None) -> Gauge:
+        return self._register(Gauge(name, documentation, callback))
+
+    def histogram(self, name: str, documentation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+BINANCE_MESSAGES = registry.counter(
+    "binance_messages_total", "Binance stream messages processed, by event type")
+BINANCE_PROCESSING_SECONDS = registry.histogram(
+    "binance_message_processing_seconds", "Time spent in _process_message")
+BINANCE_INGEST_LAG_SECONDS = registry.histogram(
+    "binance_ingest_lag_seconds", "Delay between Binance event time and local ingest", LAG_BUCKETS)
+BINANCE_LAST_MESSAGE = registry.gauge(
+    "binance_last_message_timestamp_seconds", "Unix time of the last processed Binance message")
+
+ANALYTICS_SECONDS = registry.histogram(
+    "analytics_method_seconds", "Duration of AnalyticsService methods")
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "REST request latency by route")
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "REST requests by route and status code")
+
+JSON_SERIALIZE_SECONDS = registry.histogram(
+    "websocket_json_serialize_seconds", "Time spent serializing websocket payloads")
+WEBSOCKET_SEND_SECONDS = registry.histogram(
+    "websocket_send_seconds", "Time spent awaiting websocket sends")
+WEBSOCKET_SENT_BYTES = registry.counter(
+    "websocket_sent_bytes_total", "Bytes sent over websockets")
+WEBSOCKET_CONNECTIONS = registry.gauge(
+    "websocket_connections", "Open websocket connections by endpoint")
+WEBSOCKET_PENDING_SENDS = registry.gauge(
+    "websocket_pending_sends", "Websocket sends currently awaiting the transport (send-queue depth)")
+
+HTTP_CACHE_RESULTS = registry.counter(
+    "http_cache_results_total", "Cacheable REST responses by endpoint and outcome (not_modified, hit, miss)")
+
+SIGNAL_EVALUATION_SECONDS = registry.histogram(
+    "signal_rule_evaluation_seconds", "Time spent matching one pair's rules against its metrics on a candle close")
+SIGNALS_FIRED = registry.counter(
+    "signals_fired_total", "Signals fired by the rule engine")
+
+
+def timed(histogram: Histogram, **labels):
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started, **labels)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, **labels)
+        return wrapper
+
+    return decorator
+
+
+def json_dumps(payload, endpoint: str) -> str:
+    started = time.perf_counter()
+    text = json.dumps(payload)
+    JSON_SERIALIZE_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+    return text
+
+
+async def send_text(websocket, payload, endpoint: str):
+    text = payload if isinstance(payload, str) else json_dumps(payload, endpoint)
+    WEBSOCKET_PENDING_SENDS.inc(endpoint=endpoint)
+    started = time.perf_counter()
+    try:
+        await websocket.send_text(text)
+    finally:
+        WEBSOCKET_PENDING_SENDS.dec(endpoint=endpoint)
+        WEBSOCKET_SEND_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+    WEBSOCKET_SENT_BYTES.inc(len(text), endpoint=endpoint)
+
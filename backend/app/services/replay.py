@@ -0,0 +1,200 @@
+import asyncio
+import gzip
+import json
+import logging
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from app import config
+from app.services.binance_client import BinanceWebSocketClient
+
+logger = logging.getLogger(__name__)
+
+
+# Recordings are gzip text files with one "<received_ms>\t<raw json>" line per message.
+# The stream is sync-flushed every `flush_seconds`, so a killed process loses at
+# most that much, and a new file is started every `rotate_seconds` so older
+# parts are complete gzip files.
+class MessageRecorder:
+    def __init__(self, directory: str, flush_seconds: float = config.RECORD_FLUSH_SECONDS,
+                 rotate_seconds: float = config.RECORD_ROTATE_MINUTES * 60):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_seconds = flush_seconds
+        self.rotate_seconds = rotate_seconds
+        self.session = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.part = 0
+        self.message_count = 0
+        self._open()
+
+    def _open(self):
+        self.path = self.directory / f"binance-{self.session}-{self.part:04d}.log.gz"
+        self._file = gzip.open(self.path, "at", encoding="utf-8")
+        self._opened_at = self._flushed_at = time.monotonic()
+        logger.info(f"Recording Binance stream to {self.path}")
+
+    def record(self, raw: str, received_ms: Optional[int] = None):
+        if received_ms is None:
+            received_ms = int(time.time() * 1000)
+        self._file.write(f"{received_ms}\t{raw}\n")
+        self.message_count += 1
+
+        now = time.monotonic()
+        if self.rotate_seconds > 0 and now - self._opened_at >= self.rotate_seconds:
+            self._file.close()
+            self.part += 1
+            self._open()
+        elif now - self._flushed_at >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        # Z_SYNC_FLUSH byte-aligns the deflate stream, so everything written so
+        # far can be decompressed even if the gzip trailer is never written
+        self._file.flush()
+        self._file.buffer.flush(zlib.Z_SYNC_FLUSH)
+        self._flushed_at = time.monotonic()
+
+    def record_candle(self, symbol: str, candle: list):
+        # Historical REST candles are stored as closed kline events so a replay
+        # starts from the same warm buffers as the recorded session did.
+        message = {
+            "e": "kline",
+            "E": candle[6],
+            "s": symbol.upper(),
+            "k": {
+                "t": candle[0],
+                "T": candle[6],
+                "s": symbol.upper(),
+                "i": "1m",
+                "o": candle[1],
+                "h": candle[2],
+                "l": candle[3],
+                "c": candle[4],
+                "v": candle[5],
+                "x": True
+            }
+        }
+        self.record(json.dumps(message, separators=(",", ":")), received_ms=0)
+
+    def close(self):
+        self._file.close()
+        logger.info(f"Recorded {self.message_count} messages to {self.path}")
+
+
+def resolve_recordings(path: str) -> List[Path]:
+    root = Path(path)
+    if root.is_dir():
+        return sorted(p for p in root.iterdir() if p.name.endswith(".gz"))
+    return [root]
+
+
+def read_recording(path: Path) -> Iterator[Tuple[int, str]]:
+    # A file from a process that was killed while recording has no gzip trailer
+    # and may end mid-line; replay what was flushed and treat the rest as the end
+    count = 0
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                received_ms, _, raw = line.rstrip("\n").partition("\t")
+                if raw:
+                    count += 1
+                    yield int(received_ms), raw
+    except (EOFError, gzip.BadGzipFile, zlib.error) as e:
+        logger.warning(f"Recording {path} is truncated after {count} messages ({e}); treating as end of file")
+
+
+# Drop-in replacement for the live client: feeds recorded messages through
+# _process_message at `speed` times real time (0 = as fast as possible)
+class ReplayBinanceClient(BinanceWebSocketClient):
+    measure_ingest_lag = False
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = False, shared=None):
+        super().__init__(shared=shared)
+        self.replay_path = path
+        self.speed = speed
+        self.loop = loop
+        self.messages_replayed = 0
+        self.replay_seconds = 0.0
+        self.finished = asyncio.Event()
+
+    async def start(self):
+        self.is_running = True
+        files = resolve_recordings(self.replay_path)
+        if not files:
+            logger.error(f"No recordings found at {self.replay_path}")
+            self.finished.set()
+            return
+
+        speed_label = "max" if self.speed <= 0 else f"{self.speed:g}x"
+        logger.info(f"Replaying {len(files)} recording(s) from {self.replay_path} at {speed_label} speed")
+
+        task = asyncio.create_task(self._replay(files))
+        self.tasks.append(task)
+
+    async def _replay(self, files: List[Path]):
+        try:
+            while self.is_running:
+                started = time.perf_counter()
+                count = await self._replay_once(files)
+                elapsed = time.perf_counter() - started
+                self.messages_replayed += count
+                self.replay_seconds += elapsed
+
+                rate = count / elapsed if elapsed > 0 else 0.0
+                logger.info(f"Replay pass complete: {count} messages in {elapsed:.3f}s ({rate:,.0f} msg/s)")
+
+                if not self.loop:
+                    break
+                for symbol in self.symbols:
+                    self.ohlc_data[symbol].clear()
+                    if self.shared:
+                        self.shared.clear(symbol)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error replaying recording: {e}")
+        finally:
+            self.finished.set()
+
+    async def _replay_once(self, files: List[Path]) -> int:
+        count = 0
+
+        for path in files:
+            first_ms = None
+            wall_start = time.perf_counter()
+
+            for received_ms, raw in read_recording(path):
+                if not self.is_running:
+                    return count
+
+                # Backfilled candles carry received_ms == 0 and are applied immediately
+                if self.speed > 0 and received_ms > 0:
+                    if first_ms is None:
+                        first_ms = received_ms
+                        wall_start = time.perf_counter()
+                    target = (received_ms - first_ms) / 1000 / self.speed
+                    delay = target - (time.perf_counter() - wall_start)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                await self._process_message(json.loads(raw))
+                count += 1
+
+                if count % 1000 == 0:
+                    await asyncio.sleep(0)
+
+        return count
+
+    async def stop(self):
+        logger.info("Stopping Binance replay client...")
+        self.is_running = False
+
+        for task in self.tasks:
+            task.cancel()
+
+        logger.info("Binance replay client stopped")
@@ -0,0 +1,122 @@
+import math
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# All kernels work along the last axis, so a 1-D series and a (series x time)
+# matrix of stacked spreads go through the same code path.
+
+# Cumulative sums are restarted every CHUNK points so their magnitude (and the
+# cancellation error when differencing them) stays bounded on long series.
+CHUNK = 4096
+
+# Up to this window length full windows are reduced directly (two-pass over a
+# strided view), which stays exact even when a window's variance is tiny.
+DIRECT_WINDOW = 64
+
+
+def _cumsum_mean_var(x: np.ndarray, window: int, first: int, last: int, mean: np.ndarray, var: np.ndarray):
+    # Fills mean/var for positions [first, last) from cumulative sums of each
+    # block shifted by its own mean, which keeps sum(x^2) - sum(x)^2 / n from
+    # cancelling catastrophically when the level dwarfs the in-window variation.
+    pad = [(0, 0)] * (x.ndim - 1) + [(1, 0)]
+
+    for block_start in range(first, last, CHUNK):
+        block_end = min(block_start + CHUNK, last)
+        lo = max(block_start - window + 1, 0)
+
+        segment = x[..., lo:block_end]
+        shift = segment.mean(axis=-1, keepdims=True)
+        centered = segment - shift
+        s1 = np.pad(np.cumsum(centered, axis=-1), pad)
+        s2 = np.pad(np.cumsum(centered * centered, axis=-1), pad)
+
+        end = np.arange(block_start + 1, block_end + 1)
+        start = np.maximum(end - window, 0)
+        count = (end - start).astype(float)
+
+        sum1 = s1[..., end - lo] - s1[..., start - lo]
+        sum2 = s2[..., end - lo] - s2[..., start - lo]
+
+        block_mean = sum1 / count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            block_var = (sum2 - sum1 * block_mean) / (count - 1)
+
+        mean[..., block_start:block_end] = block_mean + shift
+        var[..., block_start:block_end] = block_var
+
+
+def rolling_mean_std(x: np.ndarray, window: int, min_periods: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    # Same output as pandas rolling(window, min_periods).mean() / .std()
+    x = np.asarray(x, dtype=float)
+    n = x.shape[-1]
+    mean = np.empty_like(x)
+    var = np.empty_like(x)
+    if n == 0:
+        return mean, var
+
+    if 1 < window <= DIRECT_WINDOW and n >= window:
+        _cumsum_mean_var(x, window, 0, window - 1, mean, var)
+        view = sliding_window_view(x, window, axis=-1)
+        # Blocked so the (rows x block x window) deviation temporary stays cache sized
+        block = max(CHUNK // max(int(np.prod(x.shape[:-1])), 1), 256)
+        for block_start in range(0, view.shape[-2], block):
+            block_view = view[..., block_start:block_start + block, :]
+            block_mean = block_view.mean(axis=-1)
+            deviation = block_view - block_mean[..., None]
+            positions = slice(window - 1 + block_start, window - 1 + block_start + block_view.shape[-2])
+            mean[..., positions] = block_mean
+            var[..., positions] = np.einsum('...i,...i->...', deviation, deviation) / (window - 1)
+    else:
+        _cumsum_mean_var(x, window, 0, n, mean, var)
+
+    count = np.minimum(np.arange(1, n + 1), window)
+    var = np.maximum(var, 0.0)
+    var[..., count < 2] = np.nan
+    std = np.sqrt(var)
+
+    if min_periods > 1:
+        mean[..., count < min_periods] = np.nan
+        std[..., count < min_periods] = np.nan
+    return mean, std
+
+
+def ewm_mean_std(x: np.ndarray, halflife: float) -> Tuple[np.ndarray, np.ndarray]:
+    # Matches pandas ewm(halflife=..., adjust=True) mean and bias-corrected std.
+    # The weighted sums are first-order IIR filters, evaluated in C by lfilter.
+    # scipy.signal is imported here: it is only needed once an EWMA is requested.
+    from scipy.signal import lfilter
+
+    x = np.asarray(x, dtype=float)
+    if x.shape[-1] == 0:
+        return np.empty_like(x), np.empty_like(x)
+
+    decay = math.exp(math.log(0.5) / halflife)
+    shift = x.mean(axis=-1, keepdims=True)
+    centered = x - shift
+    ones = np.ones(x.shape[-1])
+
+    weight = lfilter([1.0], [1.0, -decay], ones)
+    weight_sq = lfilter([1.0], [1.0, -decay * decay], ones)
+    sum1 = lfilter([1.0], [1.0, -decay], centered, axis=-1)
+    sum2 = lfilter([1.0], [1.0, -decay], centered * centered, axis=-1)
+
+    mean = sum1 / weight
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var = (sum2 / weight - mean * mean) * (weight * weight) / (weight * weight - weight_sq)
+    var = np.maximum(var, 0.0)
+    var[..., weight * weight - weight_sq <= 0] = np.nan
+
+    return mean + shift, np.sqrt(var)
+
+
+def rolling_zscore(x: np.ndarray, window: int = 20, halflife: float = None) -> np.ndarray:
+    x = np.asarray(x, dtype=float)
+    if halflife:
+        mean, std = ewm_mean_std(x, halflife)
+    else:
+        mean, std = rolling_mean_std(x, window)
+    std[std == 0] = 1e-8
+    return (x - mean) / std
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+from typing import List, Optional
+
+# Fallback reference point when /proc is unavailable: first import of this module
+_IMPORTED_AT = time.time()
+
+
+def process_age() -> float:
+    # Seconds since the interpreter process was created (Linux), so the figure
+    # includes interpreter start-up and every import, not just our own code
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.time() - _IMPORTED_AT
+
+
+def resident_memory_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is kilobytes on Linux and bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def loaded_modules(candidates: List[str]) -> List[str]:
+    return [name for name in candidates if name in sys.modules]
+
+
+def startup_report(heavy_modules: List[str]) -> str:
+    rss = resident_memory_bytes()
+    rss_text = f"{rss / 1024 / 1024:.0f}MB" if rss else "unknown"
+    loaded = loaded_modules(heavy_modules)
+    return (
+        f"Startup completed in {process_age():.2f}s (pid {os.getpid()}), RSS {rss_text}, "
+        f"heavy modules loaded: {', '.join(loaded) if loaded else 'none'}"
+    )
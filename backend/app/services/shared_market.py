@@ -0,0 +1,430 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Shared-memory layout (all fields 8 bytes wide, native endianness):
+#
+#   header   HEADER_BYTES: u64[0..7] = magic, layout version, writer pid,
+#            heartbeat (ms), generation, symbol count, capacity, reserved;
+#            bytes 64.. = length-prefixed JSON list of symbols
+#   symbol i SYMBOL_META_WORDS words: u64 seq, u64 candles appended, f64 price,
+#            f64 volume, u64 has_price, u64 has_volume, 2 reserved words,
+#            then a ring of `capacity` candles x CANDLE_FIELDS f64 columns
+#
+# Each symbol block is guarded by a seqlock: the writer makes `seq` odd, mutates
+# the block, then makes it even again. Readers copy the block and retry if
+# `seq` was odd or changed while copying, so they never block the ingest loop.
+
+MAGIC = 0x50414952534D4B54  # "PAIRSMKT"
+LAYOUT_VERSION = 1
+HEADER_BYTES = 4096
+SYMBOL_META_WORDS = 8
+CANDLE_FIELDS = 6  # open time (ms), open, high, low, close, volume
+HEARTBEAT_TIMEOUT = 10.0
+# Seqlock reads: attempts before giving up, how many of them just yield the
+# CPU, and the pause between the rest (~50ms in total)
+READ_RETRIES = 100
+READ_SPINS = 50
+READ_SLEEP = 0.001
+
+
+def _block_words(capacity: int) -> int:
+    return SYMBOL_META_WORDS + capacity * CANDLE_FIELDS
+
+
+def _segment_size(n_symbols: int, capacity: int) -> int:
+    return HEADER_BYTES + n_symbols * _block_words(capacity) * 8
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Before Python 3.13 attaching registers the segment with the resource
+    # tracker, which would unlink it when an API worker exits. The spawned
+    # ingest process and workers share the parent's tracker, so unregistering
+    # afterwards would drop the writer's own registration; instead the
+    # registration is skipped while attaching.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    from multiprocessing import resource_tracker
+
+    register = resource_tracker.register
+
+    def register_except_shared_memory(resource_name, rtype):
+        if rtype != "shared_memory":
+            register(resource_name, rtype)
+
+    resource_tracker.register = register_except_shared_memory
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+_yield_cpu = getattr(os, "sched_yield", lambda: time.sleep(0))
+
+
+class SnapshotError(RuntimeError):
+    pass
+
+
+def _backoff(attempt: int):
+    # The writer holds a seqlock for microseconds, unless it was descheduled
+    # mid-write; yield the CPU first, then sleep briefly so it can finish
+    if attempt < READ_SPINS:
+        _yield_cpu()
+    else:
+        time.sleep(READ_SLEEP)
+
+
+class SharedMarketWriter:
+    def __init__(self, name: str, symbols: List[str], capacity: int = 200):
+        self.name = name
+        self.symbols = list(symbols)
+        self.capacity = capacity
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        size = _segment_size(len(self.symbols), capacity)
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by an ingest process that didn't shut down cleanly.
+            # Attached with tracking (unlike _attach) so unlink() balances the
+            # resource tracker registration instead of unregistering twice.
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        self.u64 = np.ndarray(size // 8, dtype=np.uint64, buffer=self.shm.buf)
+        self.f64 = np.ndarray(size // 8, dtype=np.float64, buffer=self.shm.buf)
+        self.u64[:] = 0
+
+        symbols_json = json.dumps(self.symbols).encode()
+        self.shm.buf[64:72] = len(symbols_json).to_bytes(8, "little")
+        self.shm.buf[72:72 + len(symbols_json)] = symbols_json
+
+        self.u64[1] = LAYOUT_VERSION
+        self.u64[2] = os.getpid()
+        self.u64[4] = int.from_bytes(os.urandom(4), "little")
+        self.u64[5] = len(self.symbols)
+        self.u64[6] = capacity
+        self.heartbeat()
+        # Written last so a reader never sees a half-initialised header
+        self.u64[0] = MAGIC
+
+        logger.info(f"Shared market data segment '{name}' created ({size / 1024:.0f}KB, {len(self.symbols)} symbols)")
+
+    def _base(self, symbol: str) -> Optional[int]:
+        i = self.index.get(symbol)
+        if i is None:
+            return None
+        return HEADER_BYTES // 8 + i * _block_words(self.capacity)
+
+    def heartbeat(self):
+        self.u64[3] = int(time.time() * 1000)
+
+    def append_candle(self, symbol: str, open_ms: int, ohlc: dict):
+        base = self._base(symbol)
+        if base is None:
+            return
+        total = int(self.u64[base + 1])
+        row = base + SYMBOL_META_WORDS + (total % self.capacity) * CANDLE_FIELDS
+
+        self.u64[base] += 1
+        self.f64[row:row + CANDLE_FIELDS] = (
+            open_ms, ohlc['open'], ohlc['high'], ohlc['low'], ohlc['close'], ohlc['volume']
+        )
+        self.u64[base + 1] = total + 1
+        self.u64[base] += 1
+
+    def set_ticker(self, symbol: str, price: float, volume: Optional[float] = None):
+        base = self._base(symbol)
+        if base is None:
+            return
+        self.u64[base] += 1
+        self.f64[base + 2] = price
+        self.u64[base + 4] = 1
+        if volume is not None:
+            self.f64[base + 3] = volume
+            self.u64[base + 5] = 1
+        self.u64[base] += 1
+
+    def clear(self, symbol: str):
+        base = self._base(symbol)
+        if base is None:
+            return
+        self.u64[base] += 1
+        self.u64[base + 1] = 0
+        self.u64[base] += 1
+
+    def close(self):
+        self.u64[3] = 0
+        del self.u64, self.f64
+        self.shm.close()
+        self.shm.unlink()
+        logger.info(f"Shared market data segment '{self.name}' removed")
+
+
+class SharedMarketReader:
+    def __init__(self, name: str):
+        self.shm = _attach(name)
+        header = np.ndarray(8, dtype=np.uint64, buffer=self.shm.buf).tolist()
+        if header[0] != MAGIC or header[1] != LAYOUT_VERSION:
+            self.shm.close()
+            raise RuntimeError(f"Shared memory segment '{name}' is not a market data segment")
+
+        self.generation = header[4]
+        self.capacity = header[6]
+        length = int.from_bytes(bytes(self.shm.buf[64:72]), "little")
+        self.symbols: List[str] = json.loads(bytes(self.shm.buf[72:72 + length]).decode())
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        words = self.shm.size // 8
+        self.u64 = np.ndarray(words, dtype=np.uint64, buffer=self.shm.buf)
+        self.f64 = np.ndarray(words, dtype=np.float64, buffer=self.shm.buf)
+        self.block_words = _block_words(self.capacity)
+
+    def heartbeat_age(self) -> float:
+        heartbeat = int(self.u64[3])
+        if heartbeat == 0:
+            return float("inf")
+        return time.time() - heartbeat / 1000
+
+    def _base(self, symbol: str) -> Optional[int]:
+        i = self.index.get(symbol)
+        if i is None:
+            return None
+        return HEADER_BYTES // 8 + i * self.block_words
+
+    def _consistent(self, symbol: str, base: int, read: Callable):
+        # (seq, read()) where read() ran while the symbol's block was stable
+        for attempt in range(READ_RETRIES):
+            seq = int(self.u64[base])
+            if not seq & 1:
+                value = read()
+                if int(self.u64[base]) == seq:
+                    return seq, value
+            _backoff(attempt)
+
+        raise SnapshotError(f"Could not read a consistent snapshot for {symbol}")
+
+    def read_meta(self, symbol: str):
+        # (seq, u64 meta words, f64 meta words) from a consistent snapshot
+        base = self._base(symbol)
+        if base is None:
+            return None
+        end = base + SYMBOL_META_WORDS
+
+        seq, (meta, meta_f64) = self._consistent(
+            symbol, base, lambda: (self.u64[base:end].copy(), self.f64[base:end].copy())
+        )
+        return seq, meta, meta_f64
+
+    def read_latest(self, symbol: str):
+        # (candles appended, open time of the newest in ms) from a consistent snapshot
+        base = self._base(symbol)
+        if base is None:
+            return None
+
+        def read():
+            total = int(self.u64[base + 1])
+            row = base + SYMBOL_META_WORDS + ((total - 1) % self.capacity) * CANDLE_FIELDS
+            return total, int(self.f64[row]) if total else 0
+
+        return self._consistent(symbol, base, read)[1]
+
+    def read_candles(self, symbol: str):
+        # (seq, candle matrix in append order) from a consistent snapshot
+        base = self._base(symbol)
+        if base is None:
+            return None
+        end = base + self.block_words
+
+        seq, (total, ring) = self._consistent(
+            symbol, base, lambda: (int(self.u64[base + 1]), self.f64[base + SYMBOL_META_WORDS:end].copy())
+        )
+
+        n = min(total, self.capacity)
+        ring = ring.reshape(self.capacity, CANDLE_FIELDS)
+        start = (total - n) % self.capacity
+        candles = np.concatenate([ring[start:], ring[:start]]) if start else ring[:n]
+        return seq, candles
+
+    def close(self):
+        del self.u64, self.f64
+        self.shm.close()
+
+
+class SharedMarketClient:
+    # Read-only stand-in for BinanceWebSocketClient in API worker processes: the
+    # same accessors, served from the segment the ingest process writes.
+    def __init__(self, name: str):
+        self.name = name
+        self.reader: Optional[SharedMarketReader] = None
+        self.symbols: List[str] = []
+        self.tasks: List[asyncio.Task] = []
+        self._running = False
+        self._ohlc_cache: Dict[str, tuple] = {}
+        # Same hook as the live client, fired when the ingest process appends a
+        # candle (noticed on the next poll, at most a second later)
+        self.candle_listeners: List[Callable[[str, dict], None]] = []
+        self._candle_totals: Dict[str, int] = {}
+
+    async def start(self):
+        self._running = True
+        task = asyncio.create_task(self._attach_loop())
+        self.tasks.append(task)
+
+    async def _attach_loop(self):
+        # Waits for the ingest process and re-attaches if it is restarted
+        while self._running:
+            try:
+                if self.reader is None:
+                    self._use(SharedMarketReader(self.name))
+                elif self.reader.heartbeat_age() > HEARTBEAT_TIMEOUT:
+                    # A restarted ingest process creates a new segment under the
+                    # same name; the old mapping stays valid but goes stale
+                    candidate = SharedMarketReader(self.name)
+                    if candidate.generation != self.reader.generation:
+                        logger.info("Shared market data segment was replaced, re-attaching...")
+                        self._detach()
+                        self._use(candidate)
+                    else:
+                        candidate.close()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"Error attaching to shared market data: {e}")
+                self._detach()
+
+            # A read that lost the race with the writer is retried on the next
+            # poll; the segment itself is still valid, so it stays attached
+            if self.reader is not None:
+                try:
+                    self._notify_candles()
+                except SnapshotError as e:
+                    logger.warning(f"Shared market data read failed: {e}")
+
+            await asyncio.sleep(1)
+
+    def _notify_candles(self):
+        for symbol in self.symbols:
+            total = int(self.reader.read_meta(symbol)[1][1])
+            previous = self._candle_totals.get(symbol)
+            self._candle_totals[symbol] = total
+            # Candles already present when attaching are history, not closes
+            if previous is None or total <= previous or not self.candle_listeners:
+                continue
+            candles = self.get_ohlc(symbol, count=1)
+            if candles:
+                for listener in self.candle_listeners:
+                    listener(symbol, candles[-1])
+
+    def _use(self, reader: SharedMarketReader):
+        self.reader = reader
+        self.symbols = list(reader.symbols)
+        self._ohlc_cache.clear()
+        self._candle_totals.clear()
+        logger.info(f"✓ Attached to shared market data '{self.name}' ({len(self.symbols)} symbols)")
+
+    def _detach(self):
+        if self.reader is not None:
+            try:
+                self.reader.close()
+            except Exception:
+                pass
+        self.reader = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.reader is not None and self.reader.heartbeat_age() < HEARTBEAT_TIMEOUT
+
+    @property
+    def prices(self) -> Dict[str, float]:
+        return self.get_all_prices()
+
+    def _ohlc(self, symbol: str) -> List[dict]:
+        if self.reader is None:
+            return []
+        snapshot = self.reader.read_candles(symbol)
+        if snapshot is None:
+            return []
+        seq, candles = snapshot
+
+        cached = self._ohlc_cache.get(symbol)
+        if cached and cached[0] == seq:
+            return cached[1]
+
+        ohlc = [
+            {
+                "timestamp": datetime.fromtimestamp(row[0] / 1000).isoformat(),
+                "open": float(row[1]),
+                "high": float(row[2]),
+                "low": float(row[3]),
+                "close": float(row[4]),
+                "volume": float(row[5])
+            }
+            for row in candles.tolist()
+        ]
+        self._ohlc_cache[symbol] = (seq, ohlc)
+        return ohlc
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        return self.get_all_prices().get(symbol.lower())
+
+    def get_ohlc(self, symbol: str, count: int = 100) -> List[dict]:
+        data_list = self._ohlc(symbol.lower())
+        return data_list[-count:] if len(data_list) > count else list(data_list)
+
+    def get_candle_version(self, symbol: str) -> str:
+        if self.reader is None:
+            return "0"
+        latest = self.reader.read_latest(symbol.lower())
+        if latest is None:
+            return "0"
+        return f"{latest[0]}:{latest[1]}"
+
+    def get_volume(self, symbol: str) -> Optional[float]:
+        if self.reader is None:
+            return None
+        snapshot = self.reader.read_meta(symbol.lower())
+        if snapshot is None:
+            return None
+        _, meta, meta_f64 = snapshot
+        return float(meta_f64[3]) if meta[5] else None
+
+    def get_all_prices(self) -> Dict[str, float]:
+        prices = {}
+        if self.reader is None:
+            return prices
+        for symbol in self.symbols:
+            _, meta, meta_f64 = self.reader.read_meta(symbol)
+            if meta[4]:
+                prices[symbol] = float(meta_f64[2])
+        return prices
+
+    def get_data_counts(self) -> Dict[str, int]:
+        if self.reader is None:
+            return {}
+        return {
+            symbol: min(int(self.reader.read_meta(symbol)[1][1]), self.reader.capacity)
+            for symbol in self.symbols
+        }
+
+    async def stop(self):
+        logger.info("Detaching from shared market data...")
+        self._running = False
+        for task in self.tasks:
+            task.cancel()
+        self._detach()
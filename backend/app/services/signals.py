@@ -0,0 +1,335 @@
+import asyncio
+import itertools
+import logging
+import math
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services import metrics, workers
+from app.services.analytics_service import AnalyticsService
+
+logger = logging.getLogger(__name__)
+
+METRICS = {"zscore", "abs_zscore", "spread", "hedge_ratio", "correlation", "adf_pvalue"}
+CONDITIONS = {"above", "below"}
+
+# Metrics whose value depends on the rolling z-score parameters
+ZSCORE_METRICS = {"zscore", "abs_zscore"}
+# Metrics that need no hedge ratio at all
+PRICE_METRICS = {"correlation"}
+
+MIN_CANDLES = 20
+
+# A metric key identifies one computed value for a pair; every rule watching
+# the same key shares that computation and is evaluated against it together.
+MetricKey = Tuple[str, str, Optional[int], Optional[float]]
+
+
+class SignalRule:
+    def __init__(
+        self,
+        rule_id: int,
+        symbol_a: str,
+        symbol_b: str,
+        metric: str,
+        condition: str,
+        threshold: float,
+        regression_type: str = "ols",
+        window: int = 20,
+        halflife: Optional[float] = None,
+        name: Optional[str] = None
+    ):
+        self.rule_id = rule_id
+        self.symbol_a = symbol_a.lower()
+        self.symbol_b = symbol_b.lower()
+        self.metric = metric
+        self.condition = condition
+        self.threshold = float(threshold)
+        self.regression_type = regression_type
+        self.window = window
+        self.halflife = halflife
+        self.name = name or f"{self.symbol_a.upper()}/{self.symbol_b.upper()} {metric} {condition} {threshold:g}"
+        self.created_at = datetime.now().isoformat()
+
+    @property
+    def pair(self) -> Tuple[str, str]:
+        return self.symbol_a, self.symbol_b
+
+    @property
+    def metric_key(self) -> MetricKey:
+        if self.metric in PRICE_METRICS:
+            return self.metric, "", None, None
+        if self.metric in ZSCORE_METRICS:
+            if self.halflife:
+                return self.metric, self.regression_type, None, self.halflife
+            return self.metric, self.regression_type, self.window, None
+        return self.metric, self.regression_type, None, None
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.rule_id,
+            "name": self.name,
+            "symbolA": self.symbol_a,
+            "symbolB": self.symbol_b,
+            "metric": self.metric,
+            "condition": self.condition,
+            "threshold": self.threshold,
+            "regressionType": self.regression_type,
+            "window": self.window,
+            "halflife": self.halflife,
+            "createdAt": self.created_at
+        }
+
+
+class _RuleGroup:
+    # All rules on one metric key. Thresholds are kept sorted per condition, so
+    # the rules whose condition holds form a prefix (above) or suffix (below)
+    # found with one binary search; a rule fires when it enters that set.
+    def __init__(self):
+        self.rules: Dict[int, SignalRule] = {}
+        self.active: Dict[int, bool] = {}
+        self._built = False
+
+    def add(self, rule: SignalRule):
+        self._sync_active()
+        self.rules[rule.rule_id] = rule
+        self.active[rule.rule_id] = False
+        self._built = False
+
+    def remove(self, rule_id: int):
+        self._sync_active()
+        self.rules.pop(rule_id, None)
+        self.active.pop(rule_id, None)
+        self._built = False
+
+    def _sync_active(self):
+        if not self._built:
+            return
+        for ids, active in ((self.above_ids, self.above_active), (self.below_ids, self.below_active)):
+            for rule_id, state in zip(ids.tolist(), active.tolist()):
+                self.active[rule_id] = state
+
+    def _build(self):
+        for condition in CONDITIONS:
+            rules = sorted(
+                (rule for rule in self.rules.values() if rule.condition == condition),
+                key=lambda rule: rule.threshold
+            )
+            ids = np.array([rule.rule_id for rule in rules], dtype=np.int64)
+            setattr(self, f"{condition}_ids", ids)
+            setattr(self, f"{condition}_thresholds", np.array([rule.threshold for rule in rules], dtype=float))
+            setattr(self, f"{condition}_active", np.array([self.active[i] for i in ids.tolist()], dtype=bool))
+        self._built = True
+
+    def evaluate(self, value: float) -> List[SignalRule]:
+        if not self._built:
+            self._build()
+
+        fired = []
+        if math.isnan(value):
+            # No signal can hold on a missing value; re-arm everything
+            self.above_active[:] = False
+            self.below_active[:] = False
+            return fired
+
+        # above: threshold < value, i.e. the first k sorted thresholds
+        k = np.searchsorted(self.above_thresholds, value, side='left')
+        newly = np.flatnonzero(~self.above_active[:k])
+        self.above_active[:k] = True
+        self.above_active[k:] = False
+        fired.extend(self.rules[i] for i in self.above_ids[newly].tolist())
+
+        # below: threshold > value, i.e. every sorted threshold from k on
+        k = np.searchsorted(self.below_thresholds, value, side='right')
+        newly = np.flatnonzero(~self.below_active[k:]) + k
+        self.below_active[k:] = True
+        self.below_active[:k] = False
+        fired.extend(self.rules[i] for i in self.below_ids[newly].tolist())
+
+        return fired
+
+
+class SignalEngine:
+    def __init__(self, analytics_service: AnalyticsService, market_client, history_size: int = 1000,
+                 max_rules: int = 10000, candle_count: int = 100):
+        self.analytics_service = analytics_service
+        self.market_client = market_client
+        self.max_rules = max_rules
+        self.candle_count = candle_count
+        self.history: deque = deque(maxlen=history_size)
+        # Called with the list of signal dicts fired by one candle close
+        self.listeners: List[Callable[[List[Dict]], None]] = []
+
+        self.rules: Dict[int, SignalRule] = {}
+        # pair -> metric key -> rule group, and symbol -> pairs using it
+        self.groups: Dict[Tuple[str, str], Dict[MetricKey, _RuleGroup]] = {}
+        self.pairs_by_symbol: Dict[str, set] = {}
+        # Last candle timestamp each pair was evaluated on
+        self.evaluated_at: Dict[Tuple[str, str], str] = {}
+        self._ids = itertools.count(1)
+        # Pending off-loop evaluations, kept referenced until they finish
+        self._tasks: set = set()
+
+    def add_rule(self, **kwargs) -> SignalRule:
+        if len(self.rules) >= self.max_rules:
+            raise ValueError(f"Rule limit reached ({self.max_rules})")
+        if kwargs.get("metric") not in METRICS:
+            raise ValueError(f"Unknown metric '{kwargs.get('metric')}'")
+        if kwargs.get("condition") not in CONDITIONS:
+            raise ValueError(f"Unknown condition '{kwargs.get('condition')}'")
+
+        rule = SignalRule(next(self._ids), **kwargs)
+
+        self.rules[rule.rule_id] = rule
+        self.groups.setdefault(rule.pair, {}).setdefault(rule.metric_key, _RuleGroup()).add(rule)
+        for symbol in rule.pair:
+            self.pairs_by_symbol.setdefault(symbol, set()).add(rule.pair)
+        return rule
+
+    def remove_rule(self, rule_id: int) -> bool:
+        rule = self.rules.pop(rule_id, None)
+        if rule is None:
+            return False
+
+        pair_groups = self.groups[rule.pair]
+        group = pair_groups[rule.metric_key]
+        group.remove(rule_id)
+        if not group.rules:
+            del pair_groups[rule.metric_key]
+        if not pair_groups:
+            del self.groups[rule.pair]
+            self.evaluated_at.pop(rule.pair, None)
+            for symbol in rule.pair:
+                self.pairs_by_symbol[symbol].discard(rule.pair)
+        return True
+
+    def get_history(self, limit: int = 100) -> List[Dict]:
+        # [-0:] would be the whole history
+        return list(self.history)[-limit:] if limit > 0 else []
+
+    def on_candle_closed(self, symbol: str, candle: dict):
+        # Only pairs with a rule on this symbol are touched, and each pair is
+        # evaluated once per candle period: when its second leg closes too.
+        # Runs inside the ingest callback, so the metric computation is handed
+        # to a task that runs it off the event loop.
+        try:
+            for pair in list(self.pairs_by_symbol.get(symbol, ())):
+                job = self._prepare_pair(pair)
+                if job is None:
+                    continue
+                task = asyncio.get_running_loop().create_task(self._evaluate_pair(pair, *job))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        except Exception as e:
+            logger.error(f"Error evaluating signal rules for {symbol}: {e}")
+
+    def _prepare_pair(self, pair: Tuple[str, str]) -> Optional[Tuple[List[float], List[float], str]]:
+        ohlc_a = self.market_client.get_ohlc(pair[0], count=self.candle_count)
+        ohlc_b = self.market_client.get_ohlc(pair[1], count=self.candle_count)
+        if not ohlc_a or not ohlc_b:
+            return None
+
+        timestamp = ohlc_a[-1]['timestamp']
+        if ohlc_b[-1]['timestamp'] != timestamp or self.evaluated_at.get(pair) == timestamp:
+            return None
+
+        n = min(len(ohlc_a), len(ohlc_b))
+        if n < MIN_CANDLES:
+            return None
+        self.evaluated_at[pair] = timestamp
+
+        prices_a = [c['close'] for c in ohlc_a[-n:]]
+        prices_b = [c['close'] for c in ohlc_b[-n:]]
+        return prices_a, prices_b, timestamp
+
+    async def _evaluate_pair(self, pair: Tuple[str, str], prices_a: List[float], prices_b: List[float], timestamp: str):
+        try:
+            keys = list(self.groups.get(pair, {}))
+            if not keys:
+                return
+            # Process pool when ANALYTICS_WORKERS > 0, otherwise a thread
+            if workers.get_executor() is not None:
+                values = await workers.run_in_worker(
+                    compute_metrics, self.analytics_service, prices_a, prices_b, keys
+                )
+            else:
+                values = await asyncio.get_running_loop().run_in_executor(
+                    None, compute_metrics, self.analytics_service, prices_a, prices_b, keys
+                )
+
+            # A newer candle was picked up while this one was computing
+            if self.evaluated_at.get(pair) != timestamp:
+                return
+
+            fired = self.match_rules(pair, values, timestamp)
+            if fired:
+                self.history.extend(fired)
+                for listener in self.listeners:
+                    listener(fired)
+        except Exception as e:
+            logger.error(f"Error evaluating signal rules for {pair[0]}/{pair[1]}: {e}")
+
+    def match_rules(self, pair: Tuple[str, str], values: Dict[MetricKey, float], timestamp: str) -> List[Dict]:
+        started = time.perf_counter()
+        fired_at = datetime.now().isoformat()
+        signals = []
+        for key, group in self.groups.get(pair, {}).items():
+            # Rules registered while the metrics were computing wait for the next candle
+            value = values.get(key)
+            if value is None:
+                continue
+            for rule in group.evaluate(value):
+                signals.append({
+                    "type": "signal",
+                    "ruleId": rule.rule_id,
+                    "name": rule.name,
+                    "symbolA": rule.symbol_a,
+                    "symbolB": rule.symbol_b,
+                    "metric": rule.metric,
+                    "condition": rule.condition,
+                    "threshold": rule.threshold,
+                    "value": value,
+                    "candleTimestamp": timestamp,
+                    "firedAt": fired_at
+                })
+        metrics.SIGNAL_EVALUATION_SECONDS.observe(time.perf_counter() - started)
+        metrics.SIGNALS_FIRED.inc(len(signals))
+        return signals
+
+
+def compute_metrics(analytics_service: AnalyticsService, prices_a: List[float], prices_b: List[float],
+                    keys: List[MetricKey]) -> Dict[MetricKey, float]:
+    # Module level so it can run in the analytics process pool. Each hedge
+    # ratio, spread and z-score is computed once per pair no matter how many
+    # rules depend on it.
+    betas: Dict[str, float] = {}
+    spreads: Dict[str, np.ndarray] = {}
+    values: Dict[MetricKey, float] = {}
+
+    def spread_for(regression_type: str) -> np.ndarray:
+        if regression_type not in spreads:
+            betas[regression_type] = analytics_service.compute_hedge_ratio(prices_a, prices_b, regression_type)
+            spreads[regression_type] = analytics_service.compute_spread(prices_a, prices_b, betas[regression_type])
+        return spreads[regression_type]
+
+    for key in keys:
+        metric, regression_type, window, halflife = key
+        if metric == "correlation":
+            value = analytics_service.compute_correlation(prices_a, prices_b)
+        elif metric == "hedge_ratio":
+            spread_for(regression_type)
+            value = betas[regression_type]
+        elif metric == "spread":
+            value = spread_for(regression_type)[-1]
+        elif metric == "adf_pvalue":
+            value = analytics_service.compute_adf_test(spread_for(regression_type))['pvalue']
+        else:
+            zscore = analytics_service.compute_zscore(spread_for(regression_type), window or 20, halflife)
+            value = abs(zscore[-1]) if metric == "abs_zscore" else zscore[-1]
+        values[key] = float(value)
+
+    return values
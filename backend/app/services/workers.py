@@ -0,0 +1,44 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from app import config
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if config.ANALYTICS_WORKERS <= 0:
+        return None
+    if _executor is None:
+        # spawn rather than fork: the parent runs an event loop and aiohttp threads
+        _executor = ProcessPoolExecutor(
+            max_workers=config.ANALYTICS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Started analytics worker pool with {config.ANALYTICS_WORKERS} processes")
+    return _executor
+
+
+async def run_in_worker(fn: Callable, *args, **kwargs):
+    # fn and its arguments must be picklable; metrics recorded inside a worker
+    # process stay in that process.
+    executor = get_executor()
+    call = functools.partial(fn, *args, **kwargs)
+    if executor is None:
+        return call()
+    return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        logger.info("Analytics worker pool stopped")
@@ -0,0 +1 @@
+# Benchmark suite for the analytics service and API endpoints
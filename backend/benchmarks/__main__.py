@@ -0,0 +1,88 @@
+import argparse
+import logging
+import sys
+from datetime import datetime
+
+from benchmarks.common import environment_info, git_revision, load_results, save_results
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+# Keep analytics error logs (e.g. ADF on degenerate input) from drowning the report
+logging.getLogger('app').setLevel(logging.WARNING)
+logging.getLogger('httpx').setLevel(logging.WARNING)
+logger = logging.getLogger("benchmarks")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Micro and macro benchmarks for the pairs trading analytics backend"
+    )
+    parser.add_argument("--suite", choices=["micro", "macro", "all"], default="all")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None,
+                        help="Window sizes for micro-benchmarks (default: 100 1000 10000 100000)")
+    parser.add_argument("--only", nargs="+", default=None,
+                        help="Run only micro-benchmarks whose name contains one of these strings")
+    parser.add_argument("--full", action="store_true",
+                        help="Run slow methods (Kalman, Theil-Sen, ADF) at every window size")
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="Minimum seconds spent sampling each micro-benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per HTTP macro-benchmark")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent in-process HTTP clients")
+    parser.add_argument("--ws-connections", type=int, default=20,
+                        help="Concurrent websocket connections per websocket macro-benchmark (0 disables)")
+    parser.add_argument("--ws-duration", type=float, default=3.0,
+                        help="Seconds each websocket macro-benchmark streams for")
+    parser.add_argument("--output", default=None, help="Result JSON path (default: benchmarks/results/)")
+    parser.add_argument("--compare", default=None, help="Baseline result JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative p50 slowdown reported as a regression (default: 0.10)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    results = {
+        'revision': git_revision(),
+        'created_at': datetime.now().isoformat(),
+        'environment': environment_info(),
+        'micro': {},
+        'macro': {}
+    }
+
+    if args.suite in ("micro", "all"):
+        from benchmarks.micro import DEFAULT_SIZES, run_micro
+        logger.info("== micro-benchmarks ==")
+        results['micro'] = run_micro(
+            sizes=args.sizes or DEFAULT_SIZES,
+            only=args.only,
+            full=args.full,
+            min_time=args.min_time
+        )
+
+    if args.suite in ("macro", "all"):
+        from benchmarks.macro import run_macro
+        logger.info("== macro-benchmarks ==")
+        results['macro'] = run_macro(
+            requests=args.requests,
+            concurrency=args.concurrency,
+            ws_connections=args.ws_connections,
+            ws_duration=args.ws_duration
+        )
+
+    path = save_results(results, args.output)
+    logger.info(f"Results written to {path}")
+
+    if args.compare:
+        from benchmarks.compare import compare_results
+        logger.info(f"== comparison against {args.compare} ==")
+        regressions = compare_results(load_results(args.compare), results, threshold=args.threshold)
+        if regressions:
+            logger.info(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
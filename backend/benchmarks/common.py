@@ -0,0 +1,142 @@
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    arr = np.asarray(samples, dtype=float) * 1000.0
+    return {
+        'count': int(arr.size),
+        'mean_ms': float(arr.mean()),
+        'min_ms': float(arr.min()),
+        'p50_ms': float(np.percentile(arr, 50)),
+        'p95_ms': float(np.percentile(arr, 95)),
+        'p99_ms': float(np.percentile(arr, 99)),
+        'max_ms': float(arr.max())
+    }
+
+
+def measure(
+    fn: Callable[[], object],
+    min_repeats: int = 5,
+    max_repeats: int = 200,
+    min_time: float = 0.5
+) -> List[float]:
+    # One untimed call so lazy imports and caches don't pollute the samples
+    fn()
+
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_repeats:
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+        if len(samples) >= min_repeats and time.perf_counter() - started >= min_time:
+            break
+    return samples
+
+
+def synthetic_pair(n: int, seed: int = 42, beta: float = 0.05) -> Tuple[np.ndarray, np.ndarray]:
+    # Cointegrated pair: B is a random walk, A = beta * B + mean-reverting noise
+    rng = np.random.default_rng(seed)
+    prices_b = 2000.0 + np.cumsum(rng.normal(0, 2.0, n))
+    noise = np.zeros(n)
+    shocks = rng.normal(0, 0.5, n)
+    for t in range(1, n):
+        noise[t] = 0.9 * noise[t - 1] + shocks[t]
+    prices_a = 50.0 + beta * prices_b + noise
+    return prices_a, prices_b
+
+
+def synthetic_prices(symbols: List[str], n: int, seed: int = 42) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    common = np.cumsum(rng.normal(0, 1.0, n))
+    data = {}
+    for i, symbol in enumerate(symbols):
+        own = np.cumsum(rng.normal(0, 0.5, n))
+        data[symbol] = 100.0 * (i + 1) + common * (i + 1) + own
+    return data
+
+
+def synthetic_kline_messages(symbols: List[str], n: int, seed: int = 42) -> List[dict]:
+    prices = synthetic_prices([s.upper() for s in symbols], n, seed)
+    start = datetime(2024, 1, 1)
+    messages = []
+    for i in range(n):
+        open_ms = int((start + timedelta(minutes=i)).timestamp() * 1000)
+        for symbol, series in prices.items():
+            close = float(series[i])
+            messages.append({
+                "e": "kline",
+                "E": open_ms + 60_000,
+                "s": symbol,
+                "k": {
+                    "t": open_ms,
+                    "T": open_ms + 59_999,
+                    "s": symbol,
+                    "i": "1m",
+                    "o": str(close),
+                    "h": str(close * 1.001),
+                    "l": str(close * 0.999),
+                    "c": str(close),
+                    "v": "10.0",
+                    "x": True
+                }
+            })
+            messages.append({
+                "e": "24hrMiniTicker",
+                "E": open_ms + 60_000,
+                "s": symbol,
+                "c": str(close),
+                "v": "1000.0"
+            })
+    return messages
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def environment_info() -> Dict[str, str]:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'system': platform.system()
+    }
+
+
+def save_results(results: Dict, output: Optional[str] = None) -> Path:
+    if output:
+        path = Path(output)
+    else:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        revision = results.get('revision') or 'unknown'
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        path = RESULTS_DIR / f"{stamp}-{revision}.json"
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def load_results(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
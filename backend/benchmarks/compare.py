@@ -0,0 +1,34 @@
+import logging
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def compare_results(
+    baseline: Dict,
+    current: Dict,
+    threshold: float = 0.10,
+    metric: str = 'p50_ms'
+) -> List[Tuple[str, float, float, float]]:
+    # Returns (benchmark, baseline, current, relative change) for every benchmark
+    # present in both runs whose metric got slower by more than `threshold`.
+    regressions = []
+
+    for suite in ('micro', 'macro'):
+        base_suite = baseline.get(suite, {})
+        current_suite = current.get(suite, {})
+
+        for name in sorted(set(base_suite) & set(current_suite)):
+            before = base_suite[name].get(metric)
+            after = current_suite[name].get(metric)
+            if not before or after is None:
+                continue
+
+            change = (after - before) / before
+            marker = "REGRESSION" if change > threshold else ""
+            logger.info(f"{suite}:{name:<45} {before:10.3f} -> {after:10.3f} ({change:+7.1%}) {marker}")
+
+            if change > threshold:
+                regressions.append((f"{suite}:{name}", before, after, change))
+
+    return regressions
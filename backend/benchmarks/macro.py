@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+import app.main as main
+from app.api import http_cache
+from app.api import websocket as websocket_api
+from app.services.analytics_service import AnalyticsService
+from app.services.binance_client import BinanceWebSocketClient
+from benchmarks.common import percentiles, synthetic_kline_messages
+
+logger = logging.getLogger(__name__)
+
+
+async def build_market_client(candles: int = 200) -> BinanceWebSocketClient:
+    # Feed synthetic stream messages through the real ingest path; no network
+    client = BinanceWebSocketClient()
+    client.measure_ingest_lag = False
+    for message in synthetic_kline_messages(client.symbols, candles):
+        await client._process_message(message)
+    client.is_running = True
+    return client
+
+
+async def _drive_http(
+    http: httpx.AsyncClient,
+    method: str,
+    url: str,
+    requests: int,
+    concurrency: int,
+    json_body: Optional[dict] = None,
+    headers: Optional[dict] = None
+) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            queue.get_nowait()
+            t0 = time.perf_counter()
+            response = await http.request(method, url, json=json_body, headers=headers)
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stats = percentiles(latencies)
+    stats['throughput_rps'] = len(latencies) / elapsed if elapsed > 0 else 0.0
+    stats['errors'] = errors
+    stats['concurrency'] = concurrency
+    return stats
+
+
+class _Unpaced:
+    # Stands in for asyncio inside app.api.websocket so the streaming loops run
+    # back to back instead of at their 1-2s broadcast interval (and don't wait
+    # 100ms for a client message); everything else is the real asyncio
+    def __getattr__(self, name):
+        return getattr(asyncio, name)
+
+    @staticmethod
+    async def sleep(delay, result=None):
+        await asyncio.sleep(0)
+        return result
+
+    @staticmethod
+    def wait_for(awaitable, timeout):
+        return asyncio.wait_for(awaitable, 0)
+
+
+async def _drive_websocket(path: str, connections: int, duration: float, expected_type: str) -> Dict:
+    # `connections` concurrent clients on one endpoint for `duration` seconds
+    # with pacing removed: the interval between consecutive messages on a
+    # connection is the cost of producing and sending one update while the
+    # others compete for the loop, and messages/s is the fan-out throughput.
+    # The ASGI app is driven directly and the handlers cancelled afterwards.
+    arrivals: List[List[float]] = [[] for _ in range(connections)]
+    sizes: List[int] = []
+    marker = f'"type": "{expected_type}"'
+
+    def client(i: int):
+        connected = False
+
+        async def receive():
+            nonlocal connected
+            if not connected:
+                connected = True
+                return {'type': 'websocket.connect'}
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message['type'] == 'websocket.send':
+                text = message.get('text') or ''
+                if marker in text:
+                    arrivals[i].append(time.perf_counter())
+                    sizes.append(len(text))
+
+        scope = {
+            'type': 'websocket',
+            'asgi': {'version': '3.0'},
+            'scheme': 'ws',
+            'path': path,
+            'raw_path': path.encode(),
+            'root_path': '',
+            'query_string': b'',
+            'headers': [],
+            'client': ('127.0.0.1', 50000 + i),
+            'server': ('bench', 80),
+            'subprotocols': []
+        }
+        return main.app(scope, receive, send)
+
+    websocket_api.asyncio = _Unpaced()
+    try:
+        tasks = [asyncio.create_task(client(i)) for i in range(connections)]
+        started = time.perf_counter()
+        await asyncio.sleep(duration)
+        elapsed = time.perf_counter() - started
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        websocket_api.asyncio = asyncio
+
+    intervals = [b - a for times in arrivals for a, b in zip(times, times[1:])]
+    messages = sum(len(times) for times in arrivals)
+    stats = percentiles(intervals) if intervals else {}
+    stats['throughput_mps'] = messages / elapsed if elapsed > 0 else 0.0
+    stats['throughput_bytes_per_s'] = sum(sizes) / elapsed if elapsed > 0 else 0.0
+    stats['avg_message_bytes'] = sum(sizes) / len(sizes) if sizes else 0
+    stats['connections'] = connections
+    return stats
+
+
+async def _run_http(requests: int, concurrency: int) -> Dict[str, Dict]:
+    results = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        # Every request below repeats the same parameters on unchanged candles,
+        # so with the response cache on they would measure cache hits rather
+        # than analytics; the cached paths get their own cases afterwards
+        cache_entries = http_cache.response_cache.max_entries
+        http_cache.response_cache.max_entries = 0
+        http_cache.response_cache.entries.clear()
+        try:
+            for method in ["ols", "kalman", "huber"]:
+                key = f"POST /api/analytics/compute[{method}]"
+                results[key] = await _drive_http(
+                    http, "POST", "/api/analytics/compute", requests, concurrency,
+                    json_body={"symbolA": "BTCUSDT", "symbolB": "ETHUSDT", "regressionType": method}
+                )
+
+            symbols = [s.upper() for s in main.binance_client.symbols]
+            batch_jobs = [
+                {"symbolA": a, "symbolB": b, "regressionType": "ols"}
+                for a in symbols for b in symbols if a != b
+            ]
+            results[f"POST /api/analytics/batch[{len(batch_jobs)} ols jobs]"] = await _drive_http(
+                http, "POST", "/api/analytics/batch", requests, concurrency,
+                json_body={"jobs": batch_jobs}
+            )
+
+            results["GET /api/analytics/correlation-matrix"] = await _drive_http(
+                http, "GET", "/api/analytics/correlation-matrix", requests, concurrency
+            )
+            results["GET /api/analytics/export"] = await _drive_http(
+                http, "GET", "/api/analytics/export?symbolA=BTCUSDT&symbolB=ETHUSDT", requests, concurrency
+            )
+        finally:
+            http_cache.response_cache.max_entries = cache_entries
+
+        compute_url = "/api/analytics/compute?symbolA=BTCUSDT&symbolB=ETHUSDT&regressionType=ols"
+        etag = (await http.get(compute_url)).headers["etag"]
+        results["GET /api/analytics/compute[ols, cache hit]"] = await _drive_http(
+            http, "GET", compute_url, requests, concurrency
+        )
+        results["GET /api/analytics/compute[ols, 304]"] = await _drive_http(
+            http, "GET", compute_url, requests, concurrency, headers={"If-None-Match": etag}
+        )
+
+    for key, stats in results.items():
+        logger.info(f"{key:<45} p50={stats['p50_ms']:8.3f}ms  p99={stats['p99_ms']:8.3f}ms  "
+                    f"{stats['throughput_rps']:8.1f} req/s")
+    return results
+
+
+async def _run_websockets(connections: int, duration: float) -> Dict[str, Dict]:
+    results = {}
+    ws_cases = {
+        "WS /ws/live": ("/ws/live", "update"),
+        "WS /ws/analytics": ("/ws/analytics/btcusdt/ethusdt", "analytics"),
+    }
+    for key, (path, expected_type) in ws_cases.items():
+        key = f"{key}[{connections} clients]"
+        stats = await _drive_websocket(path, connections, duration, expected_type)
+        results[key] = stats
+        logger.info(f"{key:<45} p50={stats.get('p50_ms', 0.0):8.3f}ms  p99={stats.get('p99_ms', 0.0):8.3f}ms  "
+                    f"{stats['throughput_mps']:8.1f} msg/s  {stats['throughput_bytes_per_s'] / 1e6:6.1f} MB/s")
+    return results
+
+
+async def _run_all(requests: int, concurrency: int, ws_connections: int, ws_duration: float) -> Dict[str, Dict]:
+    results = await _run_http(requests, concurrency)
+    if ws_connections > 0:
+        results.update(await _run_websockets(ws_connections, ws_duration))
+    return results
+
+
+def run_macro(requests: int = 200, concurrency: int = 10, ws_connections: int = 20,
+              ws_duration: float = 3.0) -> Dict[str, Dict]:
+    # The benchmark owns the module globals the routers read
+    main.binance_client = asyncio.run(build_market_client())
+    main.analytics_service = AnalyticsService()
+
+    try:
+        return asyncio.run(_run_all(requests, concurrency, ws_connections, ws_duration))
+    finally:
+        main.binance_client = None
+        main.analytics_service = None
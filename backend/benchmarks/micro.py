@@ -0,0 +1,257 @@
+import logging
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.services.analytics_service import AnalyticsService
+from app.services.signals import SignalEngine
+from benchmarks.common import measure, percentiles, synthetic_pair, synthetic_prices
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+
+CORRELATION_SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT"]
+
+
+# Each case maps a window size to a zero-argument callable. max_size keeps the
+# quadratic / per-lag methods from dominating a default run; --full lifts it.
+class MicroCase:
+    def __init__(self, name: str, build: Callable[[AnalyticsService, int], Callable[[], object]],
+                 max_size: Optional[int] = None):
+        self.name = name
+        self.build = build
+        self.max_size = max_size
+
+
+def _pair_inputs(n: int):
+    prices_a, prices_b = synthetic_pair(n)
+    return prices_a, prices_b, prices_a.tolist(), prices_b.tolist()
+
+
+def _ols(service: AnalyticsService, n: int):
+    y, x, _, _ = _pair_inputs(n)
+    return lambda: service.compute_ols_regression(y, x)
+
+
+def _kalman(service: AnalyticsService, n: int):
+    y, x, _, _ = _pair_inputs(n)
+    return lambda: service.compute_kalman_filter(y, x)
+
+
+def _huber(service: AnalyticsService, n: int):
+    y, x, _, _ = _pair_inputs(n)
+    return lambda: service.compute_huber_regression(y, x)
+
+
+def _theilsen(service: AnalyticsService, n: int):
+    y, x, _, _ = _pair_inputs(n)
+    return lambda: service.compute_theilsen_regression(y, x)
+
+
+def _hedge_ratio(service: AnalyticsService, n: int):
+    _, _, list_a, list_b = _pair_inputs(n)
+    return lambda: service.compute_hedge_ratio(list_a, list_b, "ols")
+
+
+def _spread(service: AnalyticsService, n: int):
+    _, _, list_a, list_b = _pair_inputs(n)
+    beta = service.compute_hedge_ratio(list_a, list_b)
+    return lambda: service.compute_spread(list_a, list_b, beta)
+
+
+def _zscore(service: AnalyticsService, n: int):
+    _, _, list_a, list_b = _pair_inputs(n)
+    beta = service.compute_hedge_ratio(list_a, list_b)
+    spread = service.compute_spread(list_a, list_b, beta)
+    return lambda: service.compute_zscore(spread)
+
+
+def _zscore_ewma(service: AnalyticsService, n: int):
+    _, _, list_a, list_b = _pair_inputs(n)
+    beta = service.compute_hedge_ratio(list_a, list_b)
+    spread = service.compute_spread(list_a, list_b, beta)
+    return lambda: service.compute_zscore(spread, halflife=20)
+
+
+def _zscore_stacked(service: AnalyticsService, n: int):
+    # 16 spreads scored in one call, as the batch endpoint does
+    spreads = np.vstack([synthetic_pair(n, seed=seed)[0] for seed in range(16)])
+    return lambda: service.compute_zscore(spreads)
+
+
+def _stacked_spreads(n: int, rows: int = 64) -> np.ndarray:
+    return np.vstack([synthetic_pair(n, seed=seed)[0] for seed in range(rows)])
+
+
+def _stacked_baskets(n: int, rows: int = 64) -> np.ndarray:
+    return np.stack([np.vstack(synthetic_pair(n, seed=seed)) for seed in range(rows)])
+
+
+# Diagnostics are timed on 64 stacked series, each against the per-series
+# statsmodels (or NumPy polyfit, for Hurst) loop it replaces
+
+def _half_life_stacked(service: AnalyticsService, n: int):
+    spreads = _stacked_spreads(n)
+    return lambda: service.compute_half_life(spreads)
+
+
+def _half_life_statsmodels(service: AnalyticsService, n: int):
+    import statsmodels.api as sm
+
+    spreads = _stacked_spreads(n)
+
+    def run():
+        return [
+            sm.OLS(np.diff(spread), sm.add_constant(spread[:-1])).fit().params[1]
+            for spread in spreads
+        ]
+    return run
+
+
+def _hurst_stacked(service: AnalyticsService, n: int):
+    spreads = _stacked_spreads(n)
+    return lambda: service.compute_hurst_exponent(spreads)
+
+
+def _hurst_polyfit(service: AnalyticsService, n: int):
+    spreads = _stacked_spreads(n)
+    lags = np.arange(2, 21)
+
+    def run():
+        return [
+            np.polyfit(np.log(lags), np.log([np.std(s[lag:] - s[:-lag]) for lag in lags]), 1)[0]
+            for s in spreads
+        ]
+    return run
+
+
+def _johansen_stacked(service: AnalyticsService, n: int):
+    baskets = _stacked_baskets(n)
+    return lambda: service.compute_johansen_test(baskets)
+
+
+def _johansen_statsmodels(service: AnalyticsService, n: int):
+    from statsmodels.tsa.vector_ar.vecm import coint_johansen
+
+    baskets = _stacked_baskets(n)
+    return lambda: [coint_johansen(basket.T, 0, 1) for basket in baskets]
+
+
+def _rolling_cointegration(service: AnalyticsService, n: int):
+    # Window 50, stride 1: n - 49 windows
+    _, _, list_a, list_b = _pair_inputs(n)
+    return lambda: service.compute_rolling_cointegration(list_a, list_b, window=50, lags=2)
+
+
+def _rolling_adfuller(service: AnalyticsService, n: int):
+    from statsmodels.tsa.stattools import adfuller
+
+    _, _, list_a, list_b = _pair_inputs(n)
+    beta = service.compute_hedge_ratio(list_a, list_b)
+    spread = service.compute_spread(list_a, list_b, beta)
+    return lambda: [
+        adfuller(spread[start:start + 50], maxlag=2, autolag=None)
+        for start in range(len(spread) - 49)
+    ]
+
+
+def _adf(service: AnalyticsService, n: int):
+    _, _, list_a, list_b = _pair_inputs(n)
+    beta = service.compute_hedge_ratio(list_a, list_b)
+    spread = service.compute_spread(list_a, list_b, beta)
+    return lambda: service.compute_adf_test(spread)
+
+
+def _correlation(service: AnalyticsService, n: int):
+    _, _, list_a, list_b = _pair_inputs(n)
+    return lambda: service.compute_correlation(list_a, list_b)
+
+
+def _correlation_matrix(service: AnalyticsService, n: int):
+    price_data = {s: v.tolist() for s, v in synthetic_prices(CORRELATION_SYMBOLS, n).items()}
+    return lambda: service.compute_correlation_matrix(price_data)
+
+
+def _full_analytics(service: AnalyticsService, n: int):
+    _, _, list_a, list_b = _pair_inputs(n)
+    timestamps = [str(i) for i in range(n)]
+    return lambda: service.compute_full_analytics(list_a, list_b, timestamps, "ols")
+
+
+def _signal_rules(service: AnalyticsService, n: int):
+    # n rules on one pair spread over four metrics; each call matches them
+    # against the next candle's metric values, which drift like a real series
+    # (metric computation excluded)
+    engine = SignalEngine(service, market_client=None, max_rules=n)
+    rng = np.random.default_rng(0)
+    for i in range(n):
+        engine.add_rule(
+            symbol_a="btcusdt", symbol_b="ethusdt",
+            metric=("zscore", "abs_zscore", "correlation", "spread")[i % 4],
+            condition="above" if i % 2 else "below",
+            threshold=float(rng.normal())
+        )
+    pair = ("btcusdt", "ethusdt")
+    keys = list(engine.groups[pair])
+    walk = np.cumsum(rng.normal(scale=0.1, size=(256, len(keys))), axis=0)
+    values = [{key: float(v) for key, v in zip(keys, row)} for row in walk]
+    state = {"i": 0}
+
+    def run():
+        state["i"] += 1
+        return engine.match_rules(pair, values[state["i"] % len(values)], "")
+    return run
+
+
+CASES: List[MicroCase] = [
+    MicroCase("compute_ols_regression", _ols),
+    MicroCase("compute_kalman_filter", _kalman, max_size=10_000),
+    MicroCase("compute_huber_regression", _huber),
+    MicroCase("compute_theilsen_regression", _theilsen, max_size=1_000),
+    MicroCase("compute_hedge_ratio", _hedge_ratio),
+    MicroCase("compute_spread", _spread),
+    MicroCase("compute_zscore", _zscore),
+    MicroCase("compute_zscore_ewma", _zscore_ewma),
+    MicroCase("compute_zscore_stacked16", _zscore_stacked),
+    MicroCase("compute_half_life_stacked64", _half_life_stacked),
+    MicroCase("statsmodels_half_life_x64", _half_life_statsmodels, max_size=10_000),
+    MicroCase("compute_hurst_exponent_stacked64", _hurst_stacked),
+    MicroCase("polyfit_hurst_x64", _hurst_polyfit, max_size=10_000),
+    MicroCase("compute_johansen_test_stacked64", _johansen_stacked, max_size=10_000),
+    MicroCase("statsmodels_coint_johansen_x64", _johansen_statsmodels, max_size=10_000),
+    MicroCase("compute_adf_test", _adf, max_size=10_000),
+    MicroCase("compute_rolling_cointegration", _rolling_cointegration),
+    MicroCase("statsmodels_rolling_adfuller", _rolling_adfuller, max_size=1_000),
+    MicroCase("compute_correlation", _correlation),
+    MicroCase("compute_correlation_matrix", _correlation_matrix),
+    MicroCase("compute_full_analytics", _full_analytics, max_size=10_000),
+    MicroCase("signal_match_rules", _signal_rules, max_size=10_000),
+]
+
+
+def run_micro(
+    sizes: List[int] = DEFAULT_SIZES,
+    only: Optional[List[str]] = None,
+    full: bool = False,
+    min_time: float = 0.5
+) -> Dict[str, Dict]:
+    service = AnalyticsService()
+    results = {}
+
+    for case in CASES:
+        if only and not any(pattern in case.name for pattern in only):
+            continue
+
+        for n in sizes:
+            if not full and case.max_size and n > case.max_size:
+                continue
+
+            fn = case.build(service, n)
+            samples = measure(fn, min_time=min_time)
+            stats = percentiles(samples)
+            key = f"{case.name}[n={n}]"
+            results[key] = stats
+            logger.info(f"{key:<45} p50={stats['p50_ms']:10.3f}ms  p95={stats['p95_ms']:10.3f}ms")
+
+    return results
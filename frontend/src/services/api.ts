@@ -42,13 +42,14 @@ export interface WebSocketMessage {
 export async function computeAnalytics(
   request: ComputeAnalyticsRequest
 ): Promise<AnalyticsResponse> {
-  const response = await fetch(`${API_BASE_URL}/api/analytics/compute`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-    },
-    body: JSON.stringify(request),
+  // GET so the browser revalidates with If-None-Match and gets 304s between candles
+  const query = new URLSearchParams({
+    symbolA: request.symbolA,
+    symbolB: request.symbolB,
+    timeframe: request.timeframe,
+    regressionType: request.regressionType,
   });
+  const response = await fetch(`${API_BASE_URL}/api/analytics/compute?${query}`);
 
   if (!response.ok) {
     throw new Error(`Analytics API error: ${response.statusText}`);